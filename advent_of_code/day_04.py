@@ -1,4 +1,4 @@
-from util.grid_util import Coordinate, Direction, ListGrid
+from util.grid_util import ArrayGrid, Direction
 from util.input_util import get_input
 
 EXAMPLE = """..X...
@@ -19,52 +19,53 @@ MAMMMXMMMM
 MXMXAXMASX"""
 
 
-def get_word(grid: ListGrid, co: Coordinate, direction: Direction, length: int) -> str | None:
-    """Get a word starting from a specific coordination."""
+def get_word(grid: ArrayGrid, index: int, offset: int, length: int) -> str | None:
+    """Get a word starting from a specific cell index."""
     word = ''
-    current_co = co
     for _ in range(length):
-        if not grid.is_in_bounds(current_co):
+        if grid.cells[index] == ArrayGrid.BORDER:
             return None
-        word += grid[current_co.x][current_co.y]
-        current_co = current_co.step(direction)
+        word += chr(grid.cells[index])
+        index += offset
     return word
 
 
-def get_words_part_1(grid: ListGrid, co: Coordinate) -> list[str]:
-    """Get all words in all directions starting from a starting coordinate."""
+def get_words_part_1(grid: ArrayGrid, index: int) -> list[str]:
+    """Get all words in all directions starting from a starting cell."""
     words = []
-    for direction in Direction:
-        if word := get_word(grid, co, direction, 4):
+    for offset in grid.all_offsets:
+        if word := get_word(grid, index, offset, 4):
             words.append(word)
     return words
 
 
 def part1(input_data: str) -> int:
-    grid = ListGrid.from_input_string(input_data)
+    grid = ArrayGrid.from_input_string(input_data)
+    x = ord('X')
     total = 0
-    for x in range(grid.max_x + 1):
-        for y in range(grid.max_y + 1):
-            if grid[x][y] == 'X':
-                words = get_words_part_1(grid, Coordinate(x, y))
-                total += words.count('XMAS')
+    for index in grid.indices():
+        if grid.cells[index] == x:
+            words = get_words_part_1(grid, index)
+            total += words.count('XMAS')
     return total
 
 
-def is_x_mas(grid: ListGrid, co: Coordinate) -> bool:
-    """Returns whether there are 2 MAS centered around the coordinate."""
-    word_one = get_word(grid, co.step(Direction.NORTH_WEST), Direction.SOUTH_EAST, 3)
-    word_two = get_word(grid, co.step(Direction.NORTH_EAST), Direction.SOUTH_WEST, 3)
+def is_x_mas(grid: ArrayGrid, index: int) -> bool:
+    """Returns whether there are 2 MAS centered around the cell."""
+    north_west = grid.offsets[Direction.NORTH_WEST]
+    north_east = grid.offsets[Direction.NORTH_EAST]
+    word_one = get_word(grid, index + north_west, -north_west, 3)
+    word_two = get_word(grid, index + north_east, -north_east, 3)
     return word_one in ('MAS', 'SAM') and word_two in ('MAS', 'SAM')
 
 
 def part2(input_data: str) -> int:
-    grid = ListGrid.from_input_string(input_data)
+    grid = ArrayGrid.from_input_string(input_data)
+    a = ord('A')
     total = 0
-    for x in range(grid.max_x + 1):
-        for y in range(grid.max_y + 1):
-            if grid[x][y] == 'A' and is_x_mas(grid, Coordinate(x, y)):
-                total += 1
+    for index in grid.indices():
+        if grid.cells[index] == a and is_x_mas(grid, index):
+            total += 1
     return total
 
 
@@ -1,7 +1,9 @@
-import copy
-from collections import defaultdict
+import multiprocessing
+from array import array
+from collections.abc import Iterator
+from multiprocessing import shared_memory
 
-from util.grid_util import Coordinate, Direction, ListGrid
+from util.grid_util import ArrayGrid, Direction
 from util.input_util import get_input
 from util.timer_util import ContextTimer
 
@@ -17,78 +19,213 @@ EXAMPLE = """....#.....
 ......#..."""
 
 
-def get_start_co(grid: ListGrid) -> Coordinate:
-    for x in range(grid.max_x + 1):
-        for y in range(grid.max_y + 1):
-            if grid[x][y] == '^':
-                return Coordinate(x, y)
-    raise ValueError('No start coordinate found')
+# clockwise, so turning right is the next one in this tuple
+DIRECTIONS = (Direction.NORTH, Direction.EAST, Direction.SOUTH, Direction.WEST)
+EXIT = -1
+
+
+class InfiniteLoopException(Exception):
+    pass
+
+
+class VisitedStates:
+    """
+    Visited (cell, direction) states, as 4 bits per cell in a bytearray.
+    Instead of clearing or copying the bits for every new walk, a new epoch starts: the bits of a cell only count
+    when the cell was stamped with the current epoch.
+    """
+
+    def __init__(self, number_cells: int):
+        self.bits = bytearray(number_cells)
+        self.epochs = array('I', bytes(4 * number_cells))
+        self.epoch = 1
+
+    def new_epoch(self):
+        self.epoch += 1
+
+    def add(self, cell: int, direction_index: int) -> bool:
+        """Mark the state as visited, returns whether it was visited already."""
+        bit = 1 << direction_index
+        if self.epochs[cell] != self.epoch:
+            self.epochs[cell] = self.epoch
+            self.bits[cell] = bit
+            return False
+        if self.bits[cell] & bit:
+            return True
+        self.bits[cell] |= bit
+        return False
+
+
+def get_offsets(grid: ArrayGrid) -> tuple[int, ...]:
+    return tuple(grid.offsets[direction] for direction in DIRECTIONS)
+
+
+def get_jump_table(grid: ArrayGrid) -> list[list[int]]:
+    """
+    For every direction and every cell, the cell where the guard ends up walking straight from that cell:
+    the last cell before an obstacle, or EXIT if the guard walks off the map.
+    """
+    obstacle = ord('#')
+    cells = grid.cells
+    jump_table = []
+    for offset in get_offsets(grid):
+        stops = [EXIT] * len(cells)
+        # fill in the cells closest to the obstacles first
+        indices = range(len(cells)) if offset < 0 else range(len(cells) - 1, -1, -1)
+        for index in indices:
+            if cells[index] == obstacle or cells[index] == ArrayGrid.BORDER:
+                continue
+            next_cell = cells[index + offset]
+            if next_cell == obstacle:
+                stops[index] = index
+            elif next_cell != ArrayGrid.BORDER:
+                stops[index] = stops[index + offset]
+        jump_table.append(stops)
+    return jump_table
+
+
+def jump(grid: ArrayGrid, jump_table: list[list[int]], index: int, direction_index: int, obstacle: int | None = None) -> int:
+    """Where the guard stops, like the jump table, but with an extra obstacle that isn't in the grid."""
+    stop = jump_table[direction_index][index]
+    if obstacle is None:
+        return stop
+
+    offset = grid.offsets[DIRECTIONS[direction_index]]
+    if direction_index % 2 == 0:
+        on_line = (obstacle - index) % grid.stride == 0
+    else:
+        on_line = obstacle // grid.stride == index // grid.stride
+    if on_line:
+        steps_to_obstacle = (obstacle - index) // offset
+        if steps_to_obstacle > 0 and (stop == EXIT or steps_to_obstacle <= (stop - index) // offset):
+            return obstacle - offset
+    return stop
+
+
+def is_loop(grid: ArrayGrid, jump_table: list[list[int]], index: int, direction_index: int, obstacle: int | None = None, turns: VisitedStates | None = None) -> bool:
+    """Jump from turn to turn, it's a loop as soon as the guard turns at the same cell in the same direction twice."""
+    if turns is None:
+        turns = VisitedStates(len(grid.cells))
+    else:
+        turns.new_epoch()
+    while True:
+        index = jump(grid, jump_table, index, direction_index, obstacle)
+        if index == EXIT:
+            return False
+        if turns.add(index, direction_index):
+            return True
+        direction_index = (direction_index + 1) % 4
+
+
+def simulate(grid: ArrayGrid, index: int, direction_index: int = 0) -> int:
+    """The number of distinct cells the guard visits before leaving the map."""
+    jump_table = get_jump_table(grid)
+    offsets = get_offsets(grid)
+    visited = bytearray(len(grid.cells))
+    turns = VisitedStates(len(grid.cells))
+    while True:
+        stop = jump_table[direction_index][index]
+        offset = offsets[direction_index]
+        # mark the whole stretch the guard walks
+        while index != stop and grid.cells[index] != ArrayGrid.BORDER:
+            visited[index] = 1
+            index += offset
+        if stop == EXIT:
+            return sum(visited)
+        visited[stop] = 1
+
+        if turns.add(stop, direction_index):
+            raise InfiniteLoopException()
+        direction_index = (direction_index + 1) % 4
 
 
 def part1(input_data: str) -> int:
-    grid = ListGrid.from_input_string(input_data)
-    start_co = get_start_co(grid)
-    return simulate(grid, start_co, Direction.NORTH)
-
-
-def part2(input_data: str) -> int:
-    grid = ListGrid.from_input_string(input_data)
-    start_co = get_start_co(grid)
-    current_co = start_co
-    direction = Direction.NORTH
-    positions_visited = defaultdict(set)
-    loop_starts = set()
-    while grid.is_in_bounds(current_co):
-        positions_visited[current_co].add(direction)
-
-        next_co = current_co.step(direction)
-        if not grid.is_in_bounds(next_co):
-            break
-
-        if grid[next_co.x][next_co.y] == '#':
-            direction = Direction.rotate(direction, left=False)
+    grid = ArrayGrid.from_input_string(input_data)
+    return simulate(grid, grid.find('^'))
+
+
+def get_candidates(grid: ArrayGrid, index: int) -> Iterator[tuple[int, int, int]]:
+    """
+    Walk the original route. The first time the guard is about to enter a cell, that cell is a candidate for an extra
+    obstacle. Yields (candidate, cell, direction index) with the state of the guard right before entering it.
+    """
+    offsets = get_offsets(grid)
+    obstacle = ord('#')
+    direction_index = 0
+    visited = bytearray(len(grid.cells))
+    visited[index] = 1
+    while True:
+        next_index = index + offsets[direction_index]
+        if grid.cells[next_index] == ArrayGrid.BORDER:
+            return
+        if grid.cells[next_index] == obstacle:
+            direction_index = (direction_index + 1) % 4
             continue
-        elif next_co not in positions_visited:
-            # if we would put an obstacle on the next position
-            grid[next_co.x][next_co.y] = '#'
-            try:
-                simulate(grid, current_co, direction, copy.deepcopy(positions_visited)) is None
-            except InfiniteLoopException:
-                loop_starts.add(next_co)
-                # print(len(positions_visited), len(loop_starts))
-            grid[next_co.x][next_co.y] = '.'
+        if not visited[next_index]:
+            visited[next_index] = 1
+            yield next_index, index, direction_index
+        index = next_index
 
-        # grid[next_co.x][next_co.y] = 'X'
-        current_co = next_co
 
-    return len(loop_starts - {start_co})
+# grid, jump table and visited states of a worker process, set up by _init_worker
+_worker_state: tuple | None = None
 
 
-class InfiniteLoopException(Exception):
-    pass
+def _init_worker(grid_memory_name: str, jump_table_memory_name: str, height: int, width: int, number_cells: int):
+    global _worker_state
+    grid_memory = shared_memory.SharedMemory(grid_memory_name)
+    jump_table_memory = shared_memory.SharedMemory(jump_table_memory_name)
+    # the blocks can be larger than requested, some platforms round them up to a whole page
+    grid = ArrayGrid(height, width, cells=grid_memory.buf[:number_cells])
+    jump_table_view = jump_table_memory.buf.cast('i')[: 4 * number_cells]
+    jump_table = [jump_table_view[i * number_cells : (i + 1) * number_cells] for i in range(4)]
+    # keep the shared memory objects alive for as long as the worker lives
+    _worker_state = (grid, jump_table, VisitedStates(number_cells), grid_memory, jump_table_memory)
 
 
-def simulate(grid: ListGrid, current_co: Coordinate, direction: Direction, positions_visited: dict[Coordinate, set[Direction]] | None = None) -> int:
-    if positions_visited is None:
-        positions_visited = defaultdict(set)
-    while grid.is_in_bounds(current_co):
-        positions_visited[current_co].add(direction)
+def _find_loops(candidates: list[tuple[int, int, int]]) -> list[int]:
+    grid, jump_table, turns, *_ = _worker_state
+    return [candidate for candidate, index, direction_index in candidates if is_loop(grid, jump_table, index, direction_index, candidate, turns)]
 
-        next_co = current_co.step(direction)
-        if not grid.is_in_bounds(next_co):
-            break
 
-        if grid[next_co.x][next_co.y] == '#':
-            direction = Direction.rotate(direction, left=False)
-            continue
+def find_loops_in_parallel(grid: ArrayGrid, jump_table: list[list[int]], candidates: list[tuple[int, int, int]], processes: int) -> set[int]:
+    """
+    The candidates are independent of each other, so they can be checked in worker processes.
+    The grid and the jump table are put in shared memory once, the workers only read them.
+    """
+    jump_table_array = array('i', (stop for stops in jump_table for stop in stops))
+    grid_memory = shared_memory.SharedMemory(create=True, size=len(grid.cells))
+    jump_table_memory = shared_memory.SharedMemory(create=True, size=len(jump_table_array) * jump_table_array.itemsize)
+    try:
+        grid_memory.buf[: len(grid.cells)] = grid.cells
+        jump_table_memory.buf[: len(jump_table_array) * jump_table_array.itemsize] = jump_table_array.tobytes()
+        # a few batches per process, so a slow batch doesn't hold up the rest
+        batch_size = max(1, len(candidates) // (processes * 4) + 1)
+        batches = [candidates[i : i + batch_size] for i in range(0, len(candidates), batch_size)]
+        init_args = (grid_memory.name, jump_table_memory.name, grid.height, grid.width, len(grid.cells))
+        with multiprocessing.Pool(processes, initializer=_init_worker, initargs=init_args) as pool:
+            return {candidate for loops in pool.imap_unordered(_find_loops, batches) for candidate in loops}
+    finally:
+        grid_memory.close()
+        grid_memory.unlink()
+        jump_table_memory.close()
+        jump_table_memory.unlink()
 
-        if direction in positions_visited[next_co]:
-            raise InfiniteLoopException()
 
-        # grid[next_co.x][next_co.y] = 'X'
-        current_co = next_co
+def part2(input_data: str, processes: int = 1) -> int:
+    grid = ArrayGrid.from_input_string(input_data)
+    jump_table = get_jump_table(grid)
+    start = grid.find('^')
+    turns = VisitedStates(len(grid.cells))
+    if is_loop(grid, jump_table, start, 0, turns=turns):
+        # the route would never end
+        raise InfiniteLoopException()
 
-    return len(positions_visited)
+    # The extra obstacle is only an overlay on the jump table, the grid stays as is.
+    candidates = get_candidates(grid, start)
+    if processes > 1:
+        return len(find_loops_in_parallel(grid, jump_table, list(candidates), processes))
+    return sum(is_loop(grid, jump_table, index, direction_index, candidate, turns) for candidate, index, direction_index in candidates)
 
 
 if __name__ == '__main__':
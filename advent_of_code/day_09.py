@@ -1,92 +1,102 @@
-from util.input_util import get_input
+import heapq
+import math
+import mmap
+
+from util.input_util import get_input, get_input_bytes
 from util.timer_util import ContextTimer
 
 EXAMPLE = """2333133121414131402"""
 
 
-def part1(input_data: str) -> int:
-    ints = list(map(int, input_data.strip()))
-    file_id_and_lengths = []
-    gaps = []
-    for i in range(0, len(ints), 2):
-        file_id_and_lengths.append([i // 2, ints[i]])
-        if i + 1 < len(ints):
-            gaps.append(ints[i + 1])
-
-    gaps_reversed = list(reversed(gaps))
-    max_position = sum(l for _, l in file_id_and_lengths)
-    debug_sequence = []
-    checksum = position = 0
-
-    for file_id, amount in file_id_and_lengths:
-        for _ in range(amount):
-            checksum += position * file_id
-            position += 1
-            debug_sequence.append(file_id)
-
-        if position >= max_position:
-            return checksum
+def range_sum(position: int, length: int) -> int:
+    """The sum of the positions of a run of blocks: position + (position + 1) + ... + (position + length - 1)."""
+    return length * position + length * (length - 1) // 2
+
+
+def compact_checksum(disk_map: bytes | mmap.mmap) -> int:
+    """
+    The checksum after moving the blocks from the back into the gaps at the front, without expanding the blocks.
+    Walks the digits from the front for the files and gaps, and from the back for the files that fill the gaps.
+    This only indexes the disk map, so a memory map of a huge input works in constant memory.
+    """
+    end = len(disk_map)
+    while end and not ord('0') <= disk_map[end - 1] <= ord('9'):
+        # a trailing newline
+        end -= 1
+    if end % 2 == 0:
+        # a trailing gap doesn't matter
+        end -= 1
+
+    right = end - 1
+    right_remaining = disk_map[right] - ord('0') if right >= 0 else 0
+    checksum = position = left = 0
+    while left < right:
+        length = disk_map[left] - ord('0')
+        if left % 2 == 0:
+            checksum += left // 2 * range_sum(position, length)
+            position += length
+        else:
+            while length and left < right:
+                amount = min(length, right_remaining)
+                checksum += right // 2 * range_sum(position, amount)
+                position += amount
+                length -= amount
+                right_remaining -= amount
+                if not right_remaining:
+                    right -= 2
+                    right_remaining = disk_map[right] - ord('0') if right > left else 0
+        left += 1
+
+    if left == right:
+        # what is left of the last file that got moved partly
+        checksum += right // 2 * range_sum(position, right_remaining)
+    return checksum
 
-        gap = gaps_reversed.pop()
-        while gap > 0:
-            amount_to_fill = min(gap, file_id_and_lengths[-1][1])
-            gap -= amount_to_fill
-            for _ in range(amount_to_fill):
-                checksum += position * file_id_and_lengths[-1][0]
-                position += 1
-                debug_sequence.append(file_id_and_lengths[-1][0])
-            file_id_and_lengths[-1][1] -= amount_to_fill
-            if file_id_and_lengths[-1][1] <= 0:
-                file_id_and_lengths.pop()
 
-    raise Exception("Couldn't fill all gaps")
+def part1(input_data: str) -> int:
+    return compact_checksum(input_data.strip().encode())
 
 
 def part2(input_data: str) -> int:
     ints = list(map(int, input_data.strip()))
     file_id_to_position = []
     file_id_to_length = []
-    gap_position_and_lengths = []
+    # the positions of all gaps of every length, the leftmost one on top
+    gap_positions_by_length = [[] for _ in range(10)]
     position = 0
     for i in range(0, len(ints), 2):
         file_id_to_length.append(ints[i])
         file_id_to_position.append(position)
         position += ints[i]
         if i + 1 < len(ints):
-            gap_position_and_lengths.append([position, ints[i + 1]])
+            if ints[i + 1]:
+                # the positions are increasing, so the lists are heaps as they are
+                gap_positions_by_length[ints[i + 1]].append(position)
             position += ints[i + 1]
 
-    for file_id in list(reversed(range(1, len(file_id_to_position)))):
+    for file_id in reversed(range(1, len(file_id_to_position))):
         file_length = file_id_to_length[file_id]
-        # get the index of the first fitting gap
-        gap_index = next(iter(i for i, (_, length) in enumerate(gap_position_and_lengths) if file_length <= length), None)
-        if gap_index is not None:
-            gap_position, gap_length = gap_position_and_lengths[gap_index]
-            if gap_position > file_id_to_position[file_id]:
-                # this would be moving the file backwards
-                continue
-            file_id_to_position[file_id] = gap_position
-            if gap_length <= file_length:
-                # the gap is completely filled
-                # drop it so we don't try to fill this now empty gap
-                gap_position_and_lengths.pop(gap_index)
-            else:
-                # shrink the gap
-                gap_position_and_lengths[gap_index][0] += file_length
-                gap_position_and_lengths[gap_index][1] -= file_length
-
-    checksum = 0
-    for file_id, position in enumerate(file_id_to_position):
-        for i in range(file_id_to_length[file_id]):
-            checksum += file_id * (position + i)
-
-    return checksum
+        if not file_length:
+            continue
+        # the leftmost gap that fits is the leftmost of the gaps of every length that is long enough
+        gap_length = min(range(file_length, 10), key=lambda length: gap_positions_by_length[length][0] if gap_positions_by_length[length] else math.inf)
+        gap_positions = gap_positions_by_length[gap_length]
+        if not gap_positions or gap_positions[0] > file_id_to_position[file_id]:
+            # there is no gap, or it would be moving the file backwards
+            continue
+        gap_position = heapq.heappop(gap_positions)
+        file_id_to_position[file_id] = gap_position
+        if gap_length > file_length:
+            # the rest of the gap is a shorter gap
+            heapq.heappush(gap_positions_by_length[gap_length - file_length], gap_position + file_length)
+
+    return sum(file_id * range_sum(position, file_id_to_length[file_id]) for file_id, position in enumerate(file_id_to_position))
 
 
 if __name__ == '__main__':
     assert part1(EXAMPLE) == 1928
     with ContextTimer():
-        print(f'Solution for part 1 is: {part1(get_input())}')
+        print(f'Solution for part 1 is: {compact_checksum(get_input_bytes())}')
 
     assert part2(EXAMPLE) == 2858
     with ContextTimer():
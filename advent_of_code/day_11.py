@@ -1,45 +1,52 @@
-import functools
-from math import floor, log10
+import itertools
+from collections import Counter
+from collections.abc import Iterable, Iterator
 
 from util.input_util import get_input
-from util.timer_util import ContextTimer
+from util.timer_util import ContextTimer, profiler
 
 EXAMPLE = """125 17"""
 
 
-@functools.cache
-def blink(stone: int) -> list[int]:
-    """Advance a single stone a single time, resulting in a list of either one or two stones."""
+def blink(stone: int) -> tuple[int, ...]:
+    """Advance a single stone a single time, resulting in either one or two stones."""
     if stone == 0:
-        return [1]
-    elif (number_digits := floor(log10(stone)) + 1) and number_digits % 2 == 0:
-        right_half = stone % 10 ** (number_digits / 2)
-        left_half = (stone - right_half) / 10 ** (number_digits / 2)
-        return [int(left_half), int(right_half)]
-    else:
-        return [stone * 2024]
-
-
-@functools.cache
-def get_number_of_stones(stone: int, number_of_blinks: int) -> int:
-    """Advance a single stone and its subsequent stones any number of times, returning the number of stones in the end."""
-    next_stones = blink(stone)
-    if number_of_blinks < 1:
-        raise Exception('Unexpected number of blinks')
-    elif number_of_blinks == 1:
-        return len(next_stones)
-    else:
-        return sum(get_number_of_stones(next_stone, number_of_blinks - 1) for next_stone in next_stones)
+        return (1,)
+    number_digits = len(str(stone))
+    if number_digits % 2 == 0:
+        return divmod(stone, 10 ** (number_digits // 2))
+    return (stone * 2024,)
+
+
+def iter_blinks(stones: Iterable[int]) -> Iterator[Counter[int]]:
+    """
+    The amount of stones of every value, after every blink. The order of the stones doesn't matter,
+    so every distinct value only needs to blink once per step, no matter how many stones have it.
+    """
+    counter = Counter(stones)
+    while True:
+        next_counter = Counter()
+        for stone, amount in counter.items():
+            for next_stone in blink(stone):
+                next_counter[next_stone] += amount
+        counter = next_counter
+        profiler.gauge('distinct stones', len(counter))
+        yield counter
+
+
+def get_number_of_stones(stones: Iterable[int], number_of_blinks: int) -> int:
+    counter = Counter(stones)
+    if number_of_blinks:
+        counter = next(itertools.islice(iter_blinks(counter), number_of_blinks - 1, None))
+    return counter.total()
 
 
 def part1(input_data: str) -> int:
-    stones = list(map(int, input_data.split()))
-    return sum(get_number_of_stones(stone, 25) for stone in stones)
+    return get_number_of_stones(map(int, input_data.split()), 25)
 
 
 def part2(input_data: str) -> int:
-    stones = list(map(int, input_data.split()))
-    return sum(get_number_of_stones(stone, 75) for stone in stones)
+    return get_number_of_stones(map(int, input_data.split()), 75)
 
 
 if __name__ == '__main__':
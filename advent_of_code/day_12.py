@@ -1,9 +1,10 @@
-from collections import defaultdict
-from collections.abc import Iterator
+import itertools
+from collections.abc import Iterable, Iterator
 
-from util.grid_util import Coordinate, Direction, ListGrid
+from util.grid_util import ArrayGrid
 from util.input_util import get_input
 from util.timer_util import ContextTimer
+from util.union_find_util import UnionFind
 
 EXAMPLE = """AAAA
 BBCD
@@ -41,105 +42,138 @@ ABBAAA
 AAAAAA"""
 
 
-def get_areas(input_data: str) -> Iterator[tuple[str, set[Coordinate]]]:
-    grid = ListGrid.from_input_string(input_data)
-
-    # preprocessing
-    plant_type_to_coordinate_to_neighbours: dict[str, dict[Coordinate, list[Coordinate]]] = defaultdict(dict)
-    for x in range(grid.max_x + 1):
-        for y in range(grid.max_y + 1):
-            plant_type = grid[x][y]
-            coordinate = Coordinate(x, y)
-            plant_type_to_coordinate_to_neighbours[plant_type][coordinate] = []
-            for neighbour in coordinate.neighbours(diagonal=False).values():
-                if grid.is_in_bounds(neighbour) and grid[neighbour.x][neighbour.y] == plant_type:
-                    plant_type_to_coordinate_to_neighbours[plant_type][coordinate].append(neighbour)
-
-    for plant_type, coordinate_to_neighbours in plant_type_to_coordinate_to_neighbours.items():
-        # tile_id = the index of a coordinate. This doesn't change.
-        # plot_id = id of the plot. When 2 plots get merged, the lowest plot id will remain.
-
-        coordinate_to_tile_id = {co: i for i, co in enumerate(coordinate_to_neighbours)}
-        plot_id_to_coordinates = {i: {co} for i, co in enumerate(coordinate_to_neighbours)}
-        tile_id_to_plot_id = {i: i for i in range(len(coordinate_to_tile_id))}
-
-        to_explore = set(coordinate_to_neighbours)
-        while to_explore:
-            coordinate = to_explore.pop()
-
-            for neighbour in coordinate_to_neighbours[coordinate]:
-                # these neighbours are 1 tile away and from the same plant type
-
-                coordinate_tile_id = coordinate_to_tile_id[coordinate]
-                coordinate_plot_id = tile_id_to_plot_id[coordinate_tile_id]
-                neighbour_tile_id = coordinate_to_tile_id[neighbour]
-                neighbour_plot_id = tile_id_to_plot_id[neighbour_tile_id]
-
-                # 1. merge the coordinates of both plots
-                # 2. make the weaker tile point to the new plot
-                # 3. explore starting from the weaker tile
-                if coordinate_plot_id < neighbour_plot_id:
-                    plot_id_to_coordinates[coordinate_plot_id].update(plot_id_to_coordinates[neighbour_plot_id])
-                    tile_id_to_plot_id[neighbour_tile_id] = coordinate_plot_id
-                    to_explore.add(neighbour)
-                elif coordinate_plot_id > neighbour_plot_id:
-                    plot_id_to_coordinates[neighbour_plot_id].update(plot_id_to_coordinates[coordinate_plot_id])
-                    tile_id_to_plot_id[coordinate_tile_id] = neighbour_plot_id
-                    to_explore.add(coordinate)
-
-        for plot_id in set(tile_id_to_plot_id.values()):
-            yield plant_type, plot_id_to_coordinates[plot_id]
+NO_LABEL = -1
+
+
+def label_regions(grid: ArrayGrid) -> tuple[list[int], dict[int, int], dict[int, int]]:
+    """
+    Label the regions of the same plant in a single pass over the cells, row by row.
+    Every cell gets unioned with its north and west neighbour when they are the same plant, and the perimeter of the
+    merged region is the sum of both. Returns the label (the index of the root cell) of every cell index,
+    NO_LABEL for the border, and the area and the perimeter of every label.
+    """
+    cells = grid.cells
+    stride = grid.stride
+    union_find = UnionFind(len(cells))
+    parents = union_find.parents
+    sizes = union_find.sizes
+    find = union_find.find
+    perimeters = [0] * len(cells)
+
+    for index in grid.indices():
+        plant = cells[index]
+        same_north = cells[index - stride] == plant
+        same_west = cells[index - 1] == plant
+        perimeters[index] = 4 - same_north - same_west - (cells[index + stride] == plant) - (cells[index + 1] == plant)
+        if same_west:
+            # the cell is still on its own, so it can join the region of its west neighbour directly
+            root = parents[index] = find(index - 1)
+            sizes[root] += 1
+            perimeters[root] += perimeters[index]
+        if same_north:
+            root, neighbour_root = find(index), find(index - stride)
+            if root != neighbour_root:
+                perimeter = perimeters[root] + perimeters[neighbour_root]
+                perimeters[union_find.union(root, neighbour_root)] = perimeter
+
+    labels = [NO_LABEL] * len(cells)
+    areas = {}
+    for index in grid.indices():
+        labels[index] = label = find(index)
+        if label == index:
+            areas[label] = union_find.sizes[label]
+    return labels, areas, {label: perimeters[label] for label in areas}
+
+
+def get_plant(row: str, y: int) -> str | None:
+    return row[y] if 0 <= y < len(row) else None
+
+
+def is_corner(plant: str | None, horizontal: str | None, vertical: str | None, diagonal: str | None) -> bool:
+    """
+    Whether a cell has a corner at a vertex, given the other cells of the 2x2 window around that vertex.
+    The same plant next to it is always the same region, and so is the diagonal one if both others are.
+    """
+    if horizontal != plant and vertical != plant:
+        return True
+    return horizontal == plant and vertical == plant and diagonal != plant
+
+
+def scan_regions(rows: Iterable[str]) -> Iterator[tuple[str, int, int, int]]:
+    """
+    The plant, area, perimeter and number of corners of every region, reading the garden row by row.
+    Only the previous and the current row are kept, with the labels of their cells and a merge table of the regions
+    in them. A region is yielded as soon as a row doesn't touch it anymore, so this works on rows of a file too.
+    """
+    parents: dict[int, int] = {}
+    # area, perimeter and corners per root label
+    stats: dict[int, list[int]] = {}
+    plants: dict[int, str] = {}
+    new_labels = itertools.count()
+
+    def find(label: int) -> int:
+        while parents[label] != label:
+            parents[label] = parents[parents[label]]
+            label = parents[label]
+        return label
+
+    previous_row = ''
+    previous_labels: list[int] = []
+    # an empty row after the last one closes the regions of the last row
+    for row in itertools.chain(rows, ['']):
+        labels = []
+        for y, plant in enumerate(row):
+            label = find(labels[y - 1]) if y and row[y - 1] == plant else None
+            if y < len(previous_row) and previous_row[y] == plant:
+                north = find(previous_labels[y])
+                if label is None:
+                    label = north
+                elif label != north:
+                    parents[north] = label
+                    stats[label] = [a + b for a, b in zip(stats[label], stats.pop(north))]
+                    del plants[north]
+            if label is None:
+                label = parents[label] = next(new_labels)
+                stats[label] = [0, 0, 0]
+                plants[label] = plant
+            stats[label][0] += 1
+            labels.append(label)
+
+        labels = [find(label) for label in labels]
+        previous_labels = [find(label) for label in previous_labels]
+        width = max(len(previous_row), len(row))
+
+        for y in range(width + 1):
+            # the vertex at the top left of (row, y), in between the previous and the current row
+            north_west, north, west, current = get_plant(previous_row, y - 1), get_plant(previous_row, y), get_plant(row, y - 1), get_plant(row, y)
+            if north is not None:
+                stats[previous_labels[y]][1] += north != current
+                stats[previous_labels[y]][2] += is_corner(north, north_west, current, west)
+            if current is not None:
+                stats[labels[y]][1] += (north != current) + (west != current) + (get_plant(row, y + 1) != current)
+                stats[labels[y]][2] += is_corner(current, west, north, north_west)
+            if north_west is not None:
+                stats[previous_labels[y - 1]][2] += is_corner(north_west, north, west, current)
+            if west is not None:
+                stats[labels[y - 1]][2] += is_corner(west, current, north_west, north)
+
+        current_labels = set(labels)
+        for label in dict.fromkeys(previous_labels):
+            if label not in current_labels:
+                area, perimeter, corners = stats.pop(label)
+                yield plants.pop(label), area, perimeter, corners
+        # only the labels of the current row are still needed
+        parents = {label: label for label in current_labels}
+        previous_row, previous_labels = row, labels
 
 
 def part1(input_data: str) -> int:
-    price = 0
-    for _, coordinates in get_areas(input_data):
-        area = len(coordinates)
-        perimeter = area * 4
-        for coordinate in coordinates:
-            for neighbour in coordinate.neighbours(diagonal=False).values():
-                if neighbour in coordinates:
-                    perimeter -= 1
-        price += area * perimeter
-
-    return price
+    _, areas, perimeters = label_regions(ArrayGrid.from_input_string(input_data))
+    return sum(area * perimeters[label] for label, area in areas.items())
 
 
 def part2(input_data: str) -> int:
-    price = 0
-    for plant_type, coordinates in get_areas(input_data):
-        area = len(coordinates)
-        sides = 0
-
-        # preprocessing
-        # we need a fence for every direction which doesn't have a neighbour
-        direction_to_fences: dict[Direction, set[Coordinate]] = defaultdict(set)
-        for coordinate in coordinates:
-            for direction, neighbour in coordinate.neighbours(diagonal=False).items():
-                if neighbour not in coordinates:
-                    direction_to_fences[direction].add(coordinate)
-
-        # for every direction, every row/column, we'll scan for the number of breaks
-        for fence_direction, fences in direction_to_fences.items():
-            walk_direction = Direction.rotate(fence_direction, left=False)
-
-            # group per row/column
-            row_to_fences = defaultdict(list)
-            for fence in fences:
-                key = fence.y if walk_direction in (Direction.NORTH, Direction.SOUTH) else fence.x
-                row_to_fences[key].append(fence)
-
-            for row, row_fences in row_to_fences.items():
-                row_fences = sorted(row_fences, reverse=walk_direction in (Direction.NORTH, Direction.WEST))
-                sides += 1
-                # iterate over the row/column
-                for i in range(1, len(row_fences)):
-                    if row_fences[i - 1].step(walk_direction) != row_fences[i]:
-                        # a break in the row/column --> a new side starts here
-                        sides += 1
-
-        price += area * sides
-    return price
+    return sum(area * corners for _, area, _, corners in scan_regions(input_data.splitlines()))
 
 
 if __name__ == '__main__':
@@ -1,12 +1,19 @@
 import dataclasses
+import itertools
 import math
 import re
-import shutil
+import statistics
 from collections import defaultdict
+from collections.abc import Iterable, Iterator
 from pathlib import Path
 
 from PIL import Image
-from tqdm import tqdm
+
+try:
+    import numpy as np
+except ImportError:
+    # only needed to simulate all robots at once
+    np = None
 
 from util.grid_util import Coordinate
 from util.input_util import get_input
@@ -60,7 +67,58 @@ def get_quadrant(co: Coordinate, width: int, height: int) -> tuple[bool, bool] |
     return co.x < middle_x, co.y < middle_y
 
 
+def parse_robots(input_data: str) -> 'np.ndarray':
+    """All robots at once, as the rows x, y, velocity x and velocity y of a 4 x robots array."""
+    if np is None:
+        raise ImportError('simulating all robots at once requires numpy')
+    return np.array(re.findall(r'-?[0-9]+', input_data), dtype=np.int32).reshape(-1, 4).T.copy()
+
+
+def get_axis_positions(position: 'np.ndarray', velocity: 'np.ndarray', seconds: 'int | Iterable[int] | np.ndarray', size: int) -> 'np.ndarray':
+    """
+    The positions along one axis after the given seconds, a (times x robots) array for multiple times.
+    Only the seconds and the velocities modulo the size matter, which keeps the products small enough for int32.
+    """
+    seconds = np.asarray(seconds, dtype=np.int64) % size
+    return (position + np.multiply.outer(seconds.astype(np.int32), velocity % size)) % size
+
+
+def get_positions(robots: 'np.ndarray', seconds: 'int | Iterable[int] | np.ndarray', width: int, height: int) -> tuple['np.ndarray', 'np.ndarray']:
+    return get_axis_positions(robots[0], robots[2], seconds, width), get_axis_positions(robots[1], robots[3], seconds, height)
+
+
+def iter_position_blocks(robots: 'np.ndarray', times: 'Iterable[int] | np.ndarray', width: int, height: int, block_cells: int = 1 << 24) -> Iterator[tuple['np.ndarray', 'np.ndarray', 'np.ndarray']]:
+    """(times, x, y) for blocks of times, with as many times per block as fit in about block_cells positions."""
+    times = np.asarray(times, dtype=np.int64)
+    block_size = max(1, block_cells // max(1, robots.shape[1]))
+    for start in range(0, len(times), block_size):
+        block = times[start : start + block_size]
+        yield block, *get_positions(robots, block, width, height)
+
+
+def get_quadrant_counts(x: 'np.ndarray', y: 'np.ndarray', width: int, height: int) -> 'np.ndarray':
+    """
+    A histogram of the robots per quadrant, for every time of a (times x robots) block: a times x 4 array.
+    Robots on the middle lines don't count.
+    """
+    x, y = np.atleast_2d(x), np.atleast_2d(y)
+    middle_x = (width - 1) // 2
+    middle_y = (height - 1) // 2
+    bins = np.arange(x.shape[0])[:, None] * 4 + (x > middle_x) * 2 + (y > middle_y)
+    in_quadrant = (x != middle_x) & (y != middle_y)
+    return np.bincount(bins[in_quadrant], minlength=x.shape[0] * 4).reshape(-1, 4)
+
+
+def get_safety_factors(quadrant_counts: 'np.ndarray') -> list[int]:
+    """The product of the 4 quadrant counts for every time of a (times x 4) block, as Python ints so it can't overflow."""
+    return [math.prod(int(count) for count in counts) for counts in quadrant_counts]
+
+
 def part1(input_data: str, width: int = 101, height: int = 103) -> int:
+    if np is not None:
+        x, y = get_positions(parse_robots(input_data), 100, width, height)
+        return get_safety_factors(get_quadrant_counts(x, y, width, height))[0]
+
     robots = parse_input(input_data)
     final_coordinates = [simulate_robot(robot, width, height, 100) for robot in robots]
     quadrant_to_coordinates = defaultdict(list)
@@ -68,29 +126,12 @@ def part1(input_data: str, width: int = 101, height: int = 103) -> int:
         quadrant = get_quadrant(co, width, height)
         quadrant_to_coordinates[quadrant].append(co)
     safety_factor = 1
-    for quadrant, coordinates in quadrant_to_coordinates.items():
-        if quadrant is not None:
-            safety_factor *= len(coordinates)
+    for quadrant in itertools.product((False, True), repeat=2):
+        # an empty quadrant makes the safety factor 0
+        safety_factor *= len(quadrant_to_coordinates[quadrant])
     return safety_factor
 
 
-def part2(input_data: str, width: int = 101, height: int = 103):
-    robots = parse_input(input_data)
-
-    image_directory = Path(__file__).parent.parent / 'day_14_images'
-    try:
-        shutil.rmtree(image_directory)
-    except Exception:
-        pass
-    image_directory.mkdir()
-
-    iterations = 10000
-    filename_padding_length = math.floor(math.log10(iterations - 1)) + 1
-    for seconds in tqdm(range(iterations)):
-        coordinates = [simulate_robot(robot, width, height, seconds) for robot in robots]
-        create_image(coordinates, width, height, (image_directory / f'{seconds:0{filename_padding_length}d}.bmp').as_posix())
-
-
 def create_image(white_pixel_coordinates: list[Coordinate], width: int, height: int, filename: str):
     img = Image.new('RGB', (width, height), 'black')
     for co in white_pixel_coordinates:
@@ -98,15 +139,45 @@ def create_image(white_pixel_coordinates: list[Coordinate], width: int, height:
     img.save(filename)
 
 
+def combine_periods(time_x: int, width: int, time_y: int, height: int) -> int:
+    """The time t with t = time_x modulo width and t = time_y modulo height, by the Chinese remainder theorem."""
+    assert math.gcd(width, height) == 1, 'the periods of both axes need to be coprime'
+    return (time_x + width * ((time_y - time_x) * pow(width, -1, height))) % (width * height)
+
+
+def part2(input_data: str, width: int = 101, height: int = 103, image_path: Path | None = None) -> int:
+    """
+    The robots form a picture at the time they are the least spread out. The x positions repeat every width seconds
+    and the y positions every height seconds, so look for the lowest variance of each axis within its own period
+    and combine both times. Only the frame of that time gets written, if an image path is given.
+    """
+    if np is not None:
+        robots = parse_robots(input_data)
+        time_x = int(get_axis_positions(robots[0], robots[2], np.arange(width), width).var(axis=1).argmin())
+        time_y = int(get_axis_positions(robots[1], robots[3], np.arange(height), height).var(axis=1).argmin())
+    else:
+        robots = parse_input(input_data)
+        time_x = min(range(width), key=lambda seconds: statistics.pvariance([simulate_robot(robot, width, height, seconds).x for robot in robots]))
+        time_y = min(range(height), key=lambda seconds: statistics.pvariance([simulate_robot(robot, width, height, seconds).y for robot in robots]))
+    seconds = combine_periods(time_x, width, time_y, height)
+
+    if image_path is not None:
+        coordinates = [simulate_robot(robot, width, height, seconds) for robot in parse_input(input_data)]
+        create_image(coordinates, width, height, Path(image_path).as_posix())
+    return seconds
+
+
 if __name__ == '__main__':
     assert simulate_robot(Robot(Coordinate(2, 4), Coordinate(2, -3)), 11, 7, 1) == Coordinate(4, 1)
     assert simulate_robot(Robot(Coordinate(2, 4), Coordinate(2, -3)), 11, 7, 2) == Coordinate(6, 5)
     assert simulate_robot(Robot(Coordinate(2, 4), Coordinate(2, -3)), 11, 7, 5) == Coordinate(1, 3)
     assert part1(EXAMPLE, 11, 7) == 12
+    # standing still in the corners, enough robots for the safety factor to overflow an int64
+    many_robots = '\n'.join(f'p={x},{y} v=0,0' for x, y in ((0, 0), (100, 0), (0, 102), (100, 102)) for _ in range(100_000))
+    assert part1(many_robots) == 100_000**4
     with ContextTimer():
         print(f'Solution for part 1 is: {part1(get_input())}')
 
     with ContextTimer():
-        part2(get_input())
-        print('Solution for part 2 is: have fun scrolling through the images')
-        # 7916
+        image_path = Path(__file__).parent.parent / 'day_14.bmp'
+        print(f'Solution for part 2 is: {part2(get_input(), image_path=image_path)}, see {image_path}')
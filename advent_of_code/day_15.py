@@ -1,6 +1,6 @@
-import copy
-
-from tqdm import tqdm
+import itertools
+from collections import deque
+from collections.abc import Iterator
 
 from util.grid_util import Coordinate, Direction, ListGrid
 from util.input_util import get_input
@@ -63,46 +63,63 @@ def modify_input(grid_str: str) -> str:
     )
 
 
-def parse_input(input_data: str, part_2: bool = False) -> tuple[ListGrid, list[Direction], Coordinate]:
+DIRECTIONS = {'^': Direction.NORTH, 'v': Direction.SOUTH, '>': Direction.EAST, '<': Direction.WEST}
+
+
+def iter_moves(moves_str: str) -> Iterator[tuple[Direction, int]]:
+    """The moves as (direction, count) runs, like >>>> as (EAST, 4), without building a list of all moves."""
+    for char, run in itertools.groupby(char for char in moves_str if char != '\n'):
+        yield DIRECTIONS[char], sum(1 for _ in run)
+
+
+def parse_input(input_data: str, part_2: bool = False) -> tuple[ListGrid, Iterator[tuple[Direction, int]], Coordinate]:
     grid_str, moves_str = input_data.split('\n\n')
     if part_2:
         grid_str = modify_input(grid_str)
     grid = ListGrid.from_input_string(grid_str)
-    moves = [{'^': Direction.NORTH, 'v': Direction.SOUTH, '>': Direction.EAST, '<': Direction.WEST}[char] for char in moves_str if char != '\n']
     start_co = next(iter(Coordinate(x, y) for x in range(grid.max_x + 1) for y in range(grid.max_y + 1) if grid[x][y] == '@'))
     grid[start_co.x][start_co.y] = '.'
-    return grid, moves, start_co
+    return grid, iter_moves(moves_str), start_co
 
 
-def execute_move_part_1(grid: ListGrid, current_position: Coordinate, direction: Direction) -> Coordinate:
-    can_move = False
+def execute_straight_run(grid: ListGrid, current_position: Coordinate, direction: Direction, count: int) -> Coordinate:
+    """
+    Move the robot count times in a direction in which every box only pushes the next cell in line: any direction
+    in part 1, horizontally in part 2. Every step uses up the nearest free cell in front of the robot, so after
+    the run the robot stands on the last free cell it used, with all boxes it passed packed in front of it, in order.
+    """
+    free = 0
+    pushed = []
     for next_co in current_position.steps(direction):
         if not grid.is_in_bounds(next_co):
             break
-        if grid[next_co.x][next_co.y] == '#':
+        char = grid[next_co.x][next_co.y]
+        if char == '#':
             break
-        if grid[next_co.x][next_co.y] == '.':
-            can_move = True
+        if char == '.':
+            free += 1
+            if free == count:
+                break
+        else:
+            pushed.append(char)
 
-    if can_move:
-        current_position = current_position.step(direction)
-        if grid[current_position.x][current_position.y] == 'O':
-            # We need to push the boxes
-            for next_co in current_position.steps(direction):
-                if grid[next_co.x][next_co.y] == '.':
-                    grid[next_co.x][next_co.y] = 'O'
-                    break
-        grid[current_position.x][current_position.y] = '.'
+    if not free:
+        return current_position
 
-    return current_position
+    new_position = current_position.step(direction, free)
+    for next_co in itertools.islice(current_position.steps(direction), free):
+        grid[next_co.x][next_co.y] = '.'
+    for next_co, char in zip(new_position.steps(direction), pushed):
+        grid[next_co.x][next_co.y] = char
+    return new_position
 
 
 def part1(input_data: str) -> int:
     grid, moves, start_co = parse_input(input_data)
 
     current_position = start_co
-    for direction in moves:
-        current_position = execute_move_part_1(grid, current_position, direction)
+    for direction, count in moves:
+        current_position = execute_straight_run(grid, current_position, direction, count)
 
     coordinates = []
     for x, line in enumerate(grid):
@@ -113,99 +130,71 @@ def part1(input_data: str) -> int:
     return sum(coordinates)
 
 
-def execute_move_part_2(i, _grid: ListGrid, current_position: Coordinate, direction: Direction) -> tuple[ListGrid, Coordinate]:
-    # i'm tired boss
-    grid = copy.deepcopy(_grid)
-    next_position = current_position.step(direction)
-    can_move = False
-    if direction == Direction.WEST:
-        first_empty_y = None
-        for y in range(1, current_position.y):
-            char = grid[current_position.x][y]
-            if char == '.':
-                first_empty_y = y
-            elif char == '#':
-                first_empty_y = None
-        if first_empty_y is not None:
-            to_shift = grid[current_position.x][first_empty_y : current_position.y]
-            shifted = to_shift[1:] + ['.']
-            grid[current_position.x][first_empty_y : current_position.y] = shifted
-            can_move = True
-
-    elif direction == Direction.EAST:
-        first_empty_y = None
-        for y in reversed(range(current_position.y + 1, grid.max_y)):
-            char = grid[current_position.x][y]
-            if char == '.':
-                first_empty_y = y
-            elif char == '#':
-                first_empty_y = None
-        if first_empty_y is not None:
-            to_shift = grid[current_position.x][current_position.y + 1 : first_empty_y + 1]
-            shifted = ['.'] + to_shift[:-1]
-            grid[current_position.x][current_position.y + 1 : first_empty_y + 1] = shifted
-            can_move = True
-
-    elif direction in (Direction.NORTH, Direction.SOUTH):
-        can_move = True
-        blocking_position_to_replace_position = {next_position: False}
-        current_x = current_position.x
-        next_x = next_position.x
-        while blocking_position_to_replace_position:
-            previous_x = current_x
-            current_x = next_x
-            next_x = current_x + 1 if direction == Direction.SOUTH else current_x - 1
-            additional_blocking_positions = {}
-            for blocking_co, replace_position in blocking_position_to_replace_position.items():
-                if _grid[blocking_co.x][blocking_co.y] == ']':
-                    additional_blocking_positions[blocking_co.step(Direction.WEST)] = False
-                elif _grid[blocking_co.x][blocking_co.y] == '[':
-                    additional_blocking_positions[blocking_co.step(Direction.EAST)] = False
-            blocking_position_to_replace_position = additional_blocking_positions | blocking_position_to_replace_position
-            new_blocking_positions = {}
-            for blocking_co, replace_position in blocking_position_to_replace_position.items():
-                char = _grid[blocking_co.x][blocking_co.y]
-                next_co = blocking_co.step(direction)
-                if char == '#':
-                    can_move = False
-                    break
-                elif char in '[]':
-                    new_blocking_positions[next_co] = True
-                elif char == '.':
-                    continue
-                # update the next tile
-                grid[next_x][next_co.y] = _grid[current_x][blocking_co.y]
-                # update the current tile
-                if replace_position:
-                    grid[current_x][blocking_co.y] = _grid[previous_x][blocking_co.y]
-                else:
-                    grid[current_x][blocking_co.y] = '.'
-            blocking_position_to_replace_position = new_blocking_positions
-
-    if can_move:
-        return grid, next_position
-    else:
-        return _grid, current_position
+def get_boxes_to_push(grid: ListGrid, position: Coordinate, direction: Direction) -> list[Coordinate] | None:
+    """
+    The left halves of all boxes that get pushed when the robot at the given position moves, nearest first.
+    None if any of them would hit a wall.
+    """
+    boxes = []
+    seen = set()
+    to_check = deque([position.step(direction)])
+    while to_check:
+        co = to_check.popleft()
+        char = grid[co.x][co.y]
+        if char == '#':
+            return None
+        if char == '.':
+            continue
+        box = co if char == '[' else co.step(Direction.WEST)
+        if box in seen:
+            continue
+        seen.add(box)
+        boxes.append(box)
+        if direction == Direction.EAST:
+            to_check.append(box.step(Direction.EAST).step(Direction.EAST))
+        elif direction == Direction.WEST:
+            to_check.append(box.step(Direction.WEST))
+        else:
+            to_check.append(box.step(direction))
+            to_check.append(box.step(Direction.EAST).step(direction))
+    return boxes
+
+
+def execute_move_part_2(grid: ListGrid, current_position: Coordinate, direction: Direction) -> Coordinate:
+    """First find everything that gets pushed, only then move it, in place. So a blocked move changes nothing."""
+    boxes = get_boxes_to_push(grid, current_position, direction)
+    if boxes is None:
+        return current_position
+
+    for box in boxes:
+        grid[box.x][box.y] = grid[box.x][box.y + 1] = '.'
+    for box in boxes:
+        new_box = box.step(direction)
+        grid[new_box.x][new_box.y] = '['
+        grid[new_box.x][new_box.y + 1] = ']'
+    return current_position.step(direction)
 
 
 def part2(input_data: str) -> int:
     grid, moves, start_co = parse_input(input_data, part_2=True)
 
     current_position = start_co
-    for i, direction in tqdm(list(enumerate(moves))):
-        # print(i)
-        # print(direction)
-        grid, current_position = execute_move_part_2(i, grid, current_position, direction)
-        # grid[current_position.x][current_position.y] = '@'
-        # grid.visualize()
-        # grid[current_position.x][current_position.y] = '.'
+    for direction, count in moves:
+        if direction in (Direction.EAST, Direction.WEST):
+            current_position = execute_straight_run(grid, current_position, direction, count)
+            continue
+        for _ in range(count):
+            next_position = execute_move_part_2(grid, current_position, direction)
+            if next_position == current_position:
+                # the rest of the run would be blocked as well
+                break
+            current_position = next_position
 
     coordinates = []
     for x, line in enumerate(grid):
         for y, char in enumerate(line):
             if char == '[':
-                best_y_distance = y
-                coordinates.append(x * 100 + best_y_distance)
+                coordinates.append(x * 100 + y)
 
     return sum(coordinates)
 
@@ -1,10 +1,9 @@
-import heapq
-import math
-from collections import defaultdict
+from collections.abc import Iterable
 
 from util.grid_util import Coordinate, Direction, ListGrid
 from util.input_util import get_input
-from util.timer_util import ContextTimer
+from util.search_util import SearchResult, a_star
+from util.timer_util import ContextTimer, profiler
 
 EXAMPLE = """###############
 #.......#....E#
@@ -41,95 +40,78 @@ EXAMPLE_2 = """#################
 #################"""
 
 
-def heuristic(position: Coordinate, direction: Direction, goal: Coordinate) -> int:
-    x_is_correct = position.x == goal.x
-    y_is_correct = position.y == goal.y
-    x_facing_the_right_way = position.x < goal.x == (direction == Direction.SOUTH)
-    y_facing_the_right_way = position.y < goal.y == (direction == Direction.EAST)
-
-    turns_needed = 0
-    if not x_is_correct and not x_facing_the_right_way:
-        turns_needed += 1
-    if not y_is_correct and not y_facing_the_right_way:
-        turns_needed += 1
-
-    return 1000 * turns_needed + Coordinate.manhattan_distance(position, goal)
+# clockwise, so rotating is a step forward or backward in this tuple
+DIRECTIONS = (Direction.NORTH, Direction.EAST, Direction.SOUTH, Direction.WEST)
 
 
-def explore(grid: ListGrid, start_direction: Direction, start: Coordinate, goal: Coordinate) -> dict[Coordinate, dict[Direction, float]]:
-    best_score = math.inf
-    scores: dict[Coordinate, dict[Direction, float]] = defaultdict(lambda: defaultdict(lambda: math.inf))
-    queue: list[tuple[int, Coordinate, Direction]] = [(0, start, start_direction)]
-
-    while queue:
-        current_score, position, direction = heapq.heappop(queue)
+def heuristic(position: Coordinate, direction: Direction, goal: Coordinate) -> int:
+    """Lower bound of the remaining score: every step that is still needed, and every turn that is still needed."""
+    needed_directions = set()
+    if position.x != goal.x:
+        needed_directions.add(Direction.SOUTH if position.x < goal.x else Direction.NORTH)
+    if position.y != goal.y:
+        needed_directions.add(Direction.EAST if position.y < goal.y else Direction.WEST)
+
+    if not needed_directions:
+        turns_needed = 0
+    elif direction in needed_directions:
+        turns_needed = len(needed_directions) - 1
+    elif Direction.opposite(direction) in needed_directions:
+        turns_needed = 2
+    else:
+        turns_needed = 1
 
-        # stop if we already got here in a better way
-        if scores[position][direction] < current_score:
-            continue
+    return 1000 * turns_needed + Coordinate.manhattan_distance(position, goal)
 
-        # stop if it's already worse than the best score
-        best_possible_score = current_score + heuristic(position, direction, goal)
-        if best_possible_score > best_score:
-            continue
 
-        # are we at the end?
-        if position == goal:
-            best_score = min(best_score, current_score)
-            continue
+def explore(grid: ListGrid, start_direction: Direction, start: Coordinate, goal: Coordinate, all_paths: bool = False) -> SearchResult:
+    """The states are (x * width + y) * 4 + the index of the direction in DIRECTIONS."""
+    width = grid.max_y + 1
+    # the maze is surrounded by walls, so stepping never leaves the grid
+    is_wall = [char == '#' for line in grid for char in line]
+    offsets = (-width, 1, width, -1)
 
+    def neighbours(state: int) -> Iterable[tuple[int, int]]:
+        cell, direction_index = divmod(state, 4)
         # try to step
-        next_position = position.step(direction)
-        if grid[next_position.x][next_position.y] != '#':
-            new_score = current_score + 1
-            if new_score < scores[next_position][direction]:
-                scores[next_position][direction] = new_score
-                heapq.heappush(queue, (new_score, next_position, direction))
-
+        next_cell = cell + offsets[direction_index]
+        if not is_wall[next_cell]:
+            yield next_cell * 4 + direction_index, 1
         # try to rotate
-        for left in (True, False):
-            next_direction = Direction.rotate(direction, left=left)
-            new_score = current_score + 1000
-            if new_score < scores[position][next_direction]:
-                scores[position][next_direction] = new_score
-                heapq.heappush(queue, (new_score, position, next_direction))
+        yield cell * 4 + (direction_index + 1) % 4, 1000
+        yield cell * 4 + (direction_index - 1) % 4, 1000
 
-    return scores
+    def state_heuristic(state: int) -> int:
+        cell, direction_index = divmod(state, 4)
+        return heuristic(Coordinate(*divmod(cell, width)), DIRECTIONS[direction_index], goal)
+
+    start_state = (start.x * width + start.y) * 4 + DIRECTIONS.index(start_direction)
+    goal_cell = goal.x * width + goal.y
+    return a_star([start_state], neighbours, len(is_wall) * 4, state_heuristic, is_goal=lambda state: state // 4 == goal_cell, all_paths=all_paths)
 
 
 def part1(input_data: str) -> int:
     grid = ListGrid.from_input_string(input_data)
     start = Coordinate(grid.max_x - 1, 1)
     goal = Coordinate(1, grid.max_y - 1)
-    scores = explore(grid, Direction.EAST, start, goal)
-    return int(min(scores[goal].values()))
+    result = explore(grid, Direction.EAST, start, goal)
+    return result.distances[result.goal]
 
 
 def part2(input_data: str) -> int:
-    grid = ListGrid.from_input_string(input_data)
-    start = Coordinate(grid.max_x - 1, 1)
-    goal = Coordinate(1, grid.max_y - 1)
-    scores = explore(grid, Direction.EAST, start, goal)
-
-    best_score = int(min(scores[goal].values()))
-    tiles = set()
-    to_explore = {(goal, direction, score) for direction, score in scores[goal].items() if score == best_score}
-    while to_explore:
-        position, direction, score = to_explore.pop()
-        tiles.add(position)
-
-        # try to step back
-        previous_position = position.step(Direction.opposite(direction))
-        previous_score = score - 1
-        if scores[previous_position][direction] == previous_score:
-            to_explore.add((previous_position, direction, previous_score))
-
-        # try to rotate
-        for left in (True, False):
-            previous_direction = Direction.rotate(direction, left=left)
-            previous_score = score - 1000
-            if scores[position][previous_direction] == previous_score:
-                to_explore.add((position, previous_direction, previous_score))
+    with profiler.span('parse'):
+        grid = ListGrid.from_input_string(input_data)
+        start = Coordinate(grid.max_x - 1, 1)
+        goal = Coordinate(1, grid.max_y - 1)
+
+    with profiler.span('search'):
+        result = explore(grid, Direction.EAST, start, goal, all_paths=True)
+
+    with profiler.span('backtrack'):
+        best_score = result.distances[result.goal]
+        goal_states = [result.goal // 4 * 4 + direction_index for direction_index in range(4)]
+        states = result.states_on_shortest_paths(state for state in goal_states if result.distances[state] == best_score)
+        tiles = {state // 4 for state in states}
 
     return len(tiles)
 
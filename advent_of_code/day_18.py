@@ -1,10 +1,10 @@
-import heapq
+from collections.abc import Iterable
 
-from tqdm import tqdm
-
-from util.grid_util import Coordinate, ListGrid
+from util.grid_util import ArrayGrid, Coordinate
 from util.input_util import get_input
+from util.search_util import bfs
 from util.timer_util import ContextTimer
+from util.union_find_util import UnionFind
 
 EXAMPLE = """5,4
 4,2
@@ -33,50 +33,69 @@ EXAMPLE = """5,4
 2,0"""
 
 
-def expore(grid: ListGrid, start: Coordinate, goal: Coordinate) -> int | None:
-    distances = {}
-    queue = [(0, start)]
-    while queue:
-        distance, co = heapq.heappop(queue)
-
-        previous_known_distance = distances.get(co)
-        if previous_known_distance is not None and distance >= previous_known_distance:
-            continue
-
-        distances[co] = distance
-
-        if co == goal:
-            return distance
+def expore(grid: ArrayGrid, start: Coordinate, goal: Coordinate) -> int | None:
+    cells = grid.cells
+    free = ord('.')
+    offsets = grid.orthogonal_offsets
 
-        for next_co in co.neighbours(diagonal=False).values():
-            if grid.is_in_bounds(next_co) and not grid[next_co.x][next_co.y]:
-                heapq.heappush(queue, (distance + 1, next_co))
+    def neighbours(index: int) -> Iterable[int]:
+        # the border of the grid isn't free, so no bounds checks are needed
+        for offset in offsets:
+            if cells[index + offset] == free:
+                yield index + offset
 
-    return None
+    goal_index = grid.index(goal.x, goal.y)
+    result = bfs([grid.index(start.x, start.y)], neighbours, len(cells), is_goal=goal_index.__eq__)
+    return None if result.goal is None else result.distances[goal_index]
 
 
 def part1(input_data: str, size: int = 70, bytes_to_fall: int = 1024) -> int:
-    grid = ListGrid([[False for _ in range(size + 1)] for _ in range(size + 1)])
+    grid = ArrayGrid(size + 1, size + 1)
     for line in input_data.splitlines()[:bytes_to_fall]:
         x, y = map(int, line.split(','))
-        grid[x][y] = True
+        grid[Coordinate(x, y)] = '#'
     start = Coordinate(0, 0)
     goal = Coordinate(size, size)
     return expore(grid, start, goal)
 
 
-def part2(input_data: str, size: int = 70) -> str:
-    start = Coordinate(0, 0)
-    goal = Coordinate(size, size)
-    grid = ListGrid([[False for _ in range(size + 1)] for _ in range(size + 1)])
-    for line in tqdm(input_data.splitlines()):
+def part2(input_data: str, size: int = 70) -> str | None:
+    """
+    The exit gets cut off as soon as the fallen bytes form a chain, diagonals included, between 2 borders:
+    the top or right border on one side, the bottom or left border on the other side.
+    Both start and exit are in the corners where these borders meet, so blocking them also counts as a chain.
+    The chains are tracked with a union-find, so every byte only costs a few unions.
+    """
+    width = size + 1
+    number_cells = width * width
+    top_right = number_cells
+    bottom_left = number_cells + 1
+    union_find = UnionFind(number_cells + 2)
+    blocked = bytearray(number_cells)
+
+    for line in input_data.splitlines():
         x, y = map(int, line.split(','))
-        grid[x][y] = True
-        # Simply try to reach the exit after every iteration
-        # Slow but it works ¯\_(ツ)_/¯
-        if expore(grid, start, goal) is None:
+        cell = x * width + y
+        if blocked[cell]:
+            continue
+        blocked[cell] = 1
+
+        if x == 0 or y == size:
+            union_find.union(cell, top_right)
+        if x == size or y == 0:
+            union_find.union(cell, bottom_left)
+        for x_diff in (-1, 0, 1):
+            for y_diff in (-1, 0, 1):
+                next_x = x + x_diff
+                next_y = y + y_diff
+                if 0 <= next_x <= size and 0 <= next_y <= size and blocked[next_x * width + next_y]:
+                    union_find.union(cell, next_x * width + next_y)
+
+        if union_find.connected(top_right, bottom_left):
             return f'{x},{y}'
 
+    return None
+
 
 if __name__ == '__main__':
     assert part1(EXAMPLE, size=6, bytes_to_fall=12) == 22
@@ -1,10 +1,10 @@
-import heapq
-import math
 from collections import defaultdict
+from collections.abc import Iterable
 
 from util.grid_util import Coordinate, ListGrid
 from util.input_util import get_input
-from util.timer_util import ContextTimer
+from util.search_util import bfs
+from util.timer_util import ContextTimer, profiler
 
 EXAMPLE = """###############
 #...#...#.....#
@@ -32,46 +32,45 @@ def parse_input(input_data: str) -> tuple[ListGrid, Coordinate, Coordinate]:
     return grid, start, goal
 
 
-def explore(grid: ListGrid, start: Coordinate, goal: Coordinate) -> dict[Coordinate]:
-    distances: dict[Coordinate, float] = defaultdict(lambda: math.inf, {start: 0})
-    queue: list[tuple[int, Coordinate]] = [(0, start)]
+def explore(grid: ListGrid, start: Coordinate, goal: Coordinate) -> list[float]:
+    """The distance from the start to every cell, indexed by x * width + y."""
+    width = grid.max_y + 1
+    is_wall = [char == '#' for line in grid for char in line]
 
-    while queue:
-        distance, position = heapq.heappop(queue)
+    def neighbours(cell: int) -> Iterable[int]:
+        x, y = divmod(cell, width)
+        for next_cell, in_bounds in ((cell - width, x > 0), (cell + width, x < grid.max_x), (cell - 1, y > 0), (cell + 1, y < width - 1)):
+            if in_bounds and not is_wall[next_cell]:
+                yield next_cell
 
-        # are we at the end?
-        if position == goal:
-            return dict(distances)
-
-        # try to step
-        for next_position in position.neighbours(diagonal=False).values():
-            if grid.is_in_bounds(next_position) and grid[next_position.x][next_position.y] != '#':
-                new_distance = distance + 1
-                if new_distance < distances[next_position]:
-                    distances[next_position] = new_distance
-                    heapq.heappush(queue, (new_distance, next_position))
+    goal_cell = goal.x * width + goal.y
+    return bfs([start.x * width + start.y], neighbours, len(is_wall), is_goal=goal_cell.__eq__).distances
 
 
 def get_time_saves(grid: ListGrid, start: Coordinate, goal: Coordinate, cheat_length: int, time_save_threshold: int = 100) -> dict[int, int]:
-    distances = explore(grid, start, goal)
-
-    cheats = defaultdict(set)
-    for x, line in list(enumerate(grid)):
-        for y, char in enumerate(line):
-            if char != '#':
-                distance = distances[Coordinate(x, y)]
-                for x_offset in range(-cheat_length, cheat_length + 1):
-                    for y_offset in range(-cheat_length + abs(x_offset), cheat_length - abs(x_offset) + 1):
-                        if x_offset or y_offset:
-                            cheat_x = x + x_offset
-                            cheat_y = y + y_offset
-                            if grid.is_in_bounds(Coordinate(cheat_x, cheat_y)) and grid[cheat_x][cheat_y] != '#':
-                                cheat_distance = distances[Coordinate(cheat_x, cheat_y)]
-                                diff = cheat_distance - distance - abs(x_offset) - abs(y_offset)
-                                if diff >= time_save_threshold:
-                                    cheats[diff].add((x, y, cheat_x, cheat_y))
+    width = grid.max_y + 1
+    with profiler.span('explore'):
+        distances = explore(grid, start, goal)
+
+    with profiler.span('cheats'):
+        cheats = defaultdict(set)
+        for x, line in list(enumerate(grid)):
+            for y, char in enumerate(line):
+                if char != '#':
+                    distance = distances[x * width + y]
+                    for x_offset in range(-cheat_length, cheat_length + 1):
+                        for y_offset in range(-cheat_length + abs(x_offset), cheat_length - abs(x_offset) + 1):
+                            if x_offset or y_offset:
+                                cheat_x = x + x_offset
+                                cheat_y = y + y_offset
+                                if grid.is_in_bounds(Coordinate(cheat_x, cheat_y)) and grid[cheat_x][cheat_y] != '#':
+                                    cheat_distance = distances[cheat_x * width + cheat_y]
+                                    diff = cheat_distance - distance - abs(x_offset) - abs(y_offset)
+                                    if diff >= time_save_threshold:
+                                        cheats[diff].add((x, y, cheat_x, cheat_y))
 
     cheats = {time_save: len(cheats) for time_save, cheats in cheats.items()}
+    profiler.count('cheats', sum(cheats.values()))
     return cheats
 
 
@@ -89,7 +88,7 @@ def part2(input_data: str, time_save_threshold: int = 100) -> int:
 
 if __name__ == '__main__':
     grid, start, goal = parse_input(EXAMPLE)
-    assert explore(grid, start, goal)[goal] == 84
+    assert explore(grid, start, goal)[goal.x * (grid.max_y + 1) + goal.y] == 84
 
     assert get_time_saves(*parse_input(EXAMPLE), cheat_length=2, time_save_threshold=1) == {2: 14, 4: 14, 6: 2, 8: 4, 10: 2, 12: 3, 20: 1, 36: 1, 38: 1, 40: 1, 64: 1}  # fmt: skip
     with ContextTimer():
@@ -1,6 +1,13 @@
-from collections import defaultdict
+import functools
+import heapq
+from array import array
+from collections.abc import Iterable, Iterator
 
-from tqdm import tqdm
+try:
+    import numpy as np
+except ImportError:
+    # only needed to evolve all buyers at once
+    np = None
 
 from util.input_util import get_input
 from util.timer_util import ContextTimer
@@ -15,6 +22,12 @@ EXAMPLE_2 = """1
 3
 2024"""
 
+STEPS = 2000
+BITS = 24
+MASK = (1 << BITS) - 1
+# A sequence of 4 price changes, each in -9..9, is a 4 digit number in base 19
+SEQUENCES = 19**4
+
 
 def next_secret(secret: int) -> int:
     secret = ((secret * 64) ^ secret) % 16777216
@@ -23,36 +36,216 @@ def next_secret(secret: int) -> int:
     return secret
 
 
-def generate_secrets(secret: int) -> list[int]:
-    secrets = [secret]
-    for _ in range(2000):
-        secrets.append(next_secret(secrets[-1]))
+# Every step only shifts, xors and masks, so it is linear over GF(2): n steps are a 24x24 bit matrix applied to the seed.
+# A matrix is stored as its 24 columns, column i being the result for a seed with only bit i set.
+Matrix = tuple[int, ...]
+
+
+def apply_matrix(matrix: Matrix, secret: int) -> int:
+    result = 0
+    for column in matrix:
+        if secret & 1:
+            result ^= column
+        secret >>= 1
+    return result
+
+
+def multiply(a: Matrix, b: Matrix) -> Matrix:
+    """The matrix that applies b first, then a."""
+    return tuple(apply_matrix(a, column) for column in b)
+
+
+@functools.cache
+def step_matrix_power(k: int) -> Matrix:
+    """The matrix of 2^k steps, by squaring the one of 2^(k-1) steps."""
+    if k == 0:
+        return tuple(next_secret(1 << i) for i in range(BITS))
+    half = step_matrix_power(k - 1)
+    return multiply(half, half)
+
+
+@functools.cache
+def jump_matrix(n: int) -> Matrix:
+    """The matrix of n steps, combined from the cached powers of two, in O(log n) matrix products."""
+    matrix = tuple(1 << i for i in range(BITS))
+    k = 0
+    while n:
+        if n & 1:
+            matrix = multiply(step_matrix_power(k), matrix)
+        n >>= 1
+        k += 1
+    return matrix
+
+
+def secret_n(seed: int, n: int) -> int:
+    """The n-th secret of a buyer, without the steps in between. Works for any n, like 10^12."""
+    if n == 0:
+        return seed
+    return apply_matrix(jump_matrix(n), seed & MASK)
+
+
+def jump_secrets(seeds: 'np.ndarray', n: int) -> 'np.ndarray':
+    """The n-th secret of all buyers at once: the xor of the matrix columns of the bits that are set, 24 array operations."""
+    if n == 0:
+        return seeds.astype(np.uint32)
+    result = np.zeros(len(seeds), dtype=np.uint32)
+    bit = np.empty(len(seeds), dtype=np.uint32)
+    for i, column in enumerate(jump_matrix(n)):
+        np.right_shift(seeds, i, out=bit, casting='unsafe')
+        np.bitwise_and(bit, 1, out=bit)
+        np.multiply(bit, column, out=bit)
+        np.bitwise_xor(result, bit, out=result)
+    return result
+
+
+def parse_seeds(input_data: str) -> 'np.ndarray':
+    if np is None:
+        raise ImportError('evolving all buyers at once requires numpy')
+    return np.array(input_data.split(), dtype=np.uint32)
+
+
+def next_secrets(secrets: 'np.ndarray', scratch: 'np.ndarray | None' = None) -> 'np.ndarray':
+    """
+    Evolve the secrets of all buyers by one step, in place. They have to be below 2^24 already, like the result is:
+    the masks only apply to the shifted terms.
+    Pass a scratch array of the same shape to avoid allocating temporary arrays on every step.
+    """
+    if scratch is None:
+        scratch = np.empty_like(secrets)
+    np.left_shift(secrets, 6, out=scratch)
+    np.bitwise_and(scratch, MASK, out=scratch)
+    np.bitwise_xor(secrets, scratch, out=secrets)
+    np.right_shift(secrets, 5, out=scratch)
+    np.bitwise_xor(secrets, scratch, out=secrets)
+    np.left_shift(secrets, 11, out=scratch)
+    np.bitwise_and(scratch, MASK, out=scratch)
+    np.bitwise_xor(secrets, scratch, out=secrets)
+    return secrets
+
+
+# Evolving a block of buyers at a time keeps it in the CPU cache for all steps, which is a lot faster than all at once
+BLOCK_SIZE = 1 << 16
+
+
+def nth_secrets(seeds: 'np.ndarray', steps: int = STEPS) -> 'np.ndarray':
+    """The secrets of all buyers after the given number of steps, without keeping the ones in between."""
+    secrets = seeds.astype(np.uint32)
+    if steps:
+        # the first step drops the bits above 24, like next_secret does
+        secrets &= MASK
+    scratch = np.empty(min(len(secrets), BLOCK_SIZE), dtype=np.uint32)
+    for start in range(0, len(secrets), BLOCK_SIZE):
+        block = secrets[start : start + BLOCK_SIZE]
+        for _ in range(steps):
+            next_secrets(block, scratch[: len(block)])
     return secrets
 
 
+def generate_secret_matrix(seeds: 'np.ndarray', steps: int = STEPS) -> 'np.ndarray':
+    """A (steps + 1) x buyers matrix with all secrets of every buyer, the seeds in the first row."""
+    matrix = np.empty((steps + 1, len(seeds)), dtype=np.uint32)
+    matrix[0] = seeds
+    scratch = np.empty(len(seeds), dtype=np.uint32)
+    for step in range(steps):
+        # the bits of a seed above 24 don't survive the first step, like in next_secret
+        np.bitwise_and(matrix[step], MASK, out=matrix[step + 1])
+        next_secrets(matrix[step + 1], scratch)
+    return matrix
+
+
+def iter_secret_blocks(seeds: 'np.ndarray', steps: int = STEPS, block_size: int = BLOCK_SIZE) -> Iterator['np.ndarray']:
+    """The secret matrix in blocks of columns, so a lot of buyers don't need a huge matrix in memory at once."""
+    for start in range(0, len(seeds), block_size):
+        yield generate_secret_matrix(seeds[start : start + block_size], steps)
+
+
 def part1(input_data: str) -> int:
-    total = 0
-    for line in input_data.splitlines():
-        secrets = generate_secrets(int(line))
-        total += secrets[-1]
-    return total
+    if np is not None:
+        return int(jump_secrets(parse_seeds(input_data), STEPS).sum(dtype=np.uint64))
+    return sum(secret_n(int(line), STEPS) for line in input_data.splitlines())
+
+
+def encode_changes(changes: Iterable[int]) -> int:
+    key = 0
+    for change in changes:
+        key = key * 19 + change + 9
+    return key
+
+
+def decode_changes(key: int) -> tuple[int, ...]:
+    changes = []
+    for _ in range(4):
+        key, digit = divmod(key, 19)
+        changes.append(digit - 9)
+    return tuple(changes[::-1])
+
+
+def add_bananas_per_sequence(totals: list[int], seeds: Iterable[int]):
+    """
+    Add the bananas every buyer sells for, for each sequence of changes, to the totals.
+    The sequence is a rolling base 19 key, and a buyer only sells the first time a sequence occurs. Instead of a set per
+    buyer, first_seen remembers the last buyer (epoch) that saw each sequence, so it never needs to be cleared.
+    """
+    first_seen = array('I', bytes(4 * SEQUENCES))
+    for epoch, secret in enumerate(seeds, start=1):
+        price = secret % 10
+        key = 0
+        for step in range(STEPS):
+            secret = next_secret(secret)
+            next_price = secret % 10
+            key = (key * 19 + next_price - price + 9) % SEQUENCES
+            price = next_price
+            if step >= 3 and first_seen[key] != epoch:
+                first_seen[key] = epoch
+                totals[key] += price
+
+
+# Buyers per batch for the first time table, which has a slot for every (buyer, sequence): 128 * 19^4 int16 is 33 MB
+FIRST_TIME_BLOCK_SIZE = 128
+
+
+def add_bananas_per_sequence_in_batch(totals: 'np.ndarray', seeds: 'np.ndarray'):
+    """The same as add_bananas_per_sequence, for all buyers at once with numpy."""
+    windows = STEPS - 3
+    times = np.arange(windows, dtype=np.int16)[:, None]
+    # the time a sequence first occurred per (buyer, sequence), only the slots that get read are reset first
+    first_time = np.empty(FIRST_TIME_BLOCK_SIZE * SEQUENCES, dtype=np.int16)
+    buyer_offsets = np.arange(FIRST_TIME_BLOCK_SIZE, dtype=np.int64) * SEQUENCES
+    # smaller blocks of secrets than for part 1, because of the price, change and key matrices per block
+    for matrix in iter_secret_blocks(seeds, block_size=32 * FIRST_TIME_BLOCK_SIZE):
+        prices = (matrix % 10).astype(np.int32)
+        changes = np.diff(prices, axis=0) + 9
+        keys = ((changes[:-3] * 19 + changes[1:-2]) * 19 + changes[2:-1]) * 19 + changes[3:]
+        for start in range(0, keys.shape[1], FIRST_TIME_BLOCK_SIZE):
+            block_keys = keys[:, start : start + FIRST_TIME_BLOCK_SIZE]
+            block_prices = prices[4:, start : start + FIRST_TIME_BLOCK_SIZE]
+            slots = block_keys + buyer_offsets[: block_keys.shape[1]]
+            block_times = np.broadcast_to(times, slots.shape)
+            # a plain assignment doesn't define which of the repeated slots wins, so take the minimum explicitly
+            first_time[slots] = windows
+            np.minimum.at(first_time, slots.ravel(), block_times.ravel())
+            is_first = first_time[slots] == block_times
+            totals += np.bincount(block_keys[is_first], weights=block_prices[is_first], minlength=SEQUENCES).astype(np.int64)
+
+
+def get_totals(input_data: str) -> 'np.ndarray | list[int]':
+    """The total number of bananas for every sequence of changes, indexed by its key, for top-k queries."""
+    if np is not None:
+        totals = np.zeros(SEQUENCES, dtype=np.int64)
+        add_bananas_per_sequence_in_batch(totals, parse_seeds(input_data))
+    else:
+        totals = [0] * SEQUENCES
+        add_bananas_per_sequence(totals, (int(line) for line in input_data.splitlines()))
+    return totals
+
+
+def top_sequences(totals: 'np.ndarray | list[int]', k: int) -> list[tuple[tuple[int, ...], int]]:
+    """The k best sequences of changes with their total number of bananas, the best first."""
+    return [(decode_changes(key), int(totals[key])) for key in heapq.nlargest(k, range(SEQUENCES), key=totals.__getitem__)]
 
 
 def part2(input_data: str) -> int:
-    changes_to_bananas = defaultdict(int)
-    for line in tqdm(input_data.splitlines()):
-        secrets = generate_secrets(int(line))
-        bananas = [s % 10 for s in secrets]
-        diffs = [bananas[i] - bananas[i - 1] for i in range(1, len(bananas))]
-
-        seen_sequences = set()
-        for i in range(0, len(bananas) - 4):
-            changes = tuple(diffs[i : i + 4])
-            if changes not in seen_sequences:
-                seen_sequences.add(changes)
-                changes_to_bananas[changes] += bananas[i + 4]
-
-    return max(changes_to_bananas.values())
+    return int(max(get_totals(input_data)))
 
 
 if __name__ == '__main__':
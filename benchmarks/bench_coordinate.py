@@ -0,0 +1,74 @@
+"""
+Throughput of the hot Coordinate operations, compared to the frozen dataclass Coordinate used to be.
+
+python -m benchmarks.bench_coordinate
+"""
+
+from __future__ import annotations
+
+import dataclasses
+
+from util.benchmark_util import measure
+from util.grid_util import Coordinate, Direction
+
+NUMBER_OPERATIONS = 100_000
+
+
+@dataclasses.dataclass(frozen=True)
+class LegacyCoordinate:
+    """The previous implementation, kept as a reference point."""
+
+    x: int
+    y: int
+
+    def step(self, direction: Direction, amount: int = 1):
+        assert isinstance(direction, Direction)
+        match direction:
+            case Direction.NORTH | Direction.NORTH_EAST | Direction.NORTH_WEST:
+                x_diff = -1
+            case Direction.SOUTH | Direction.SOUTH_EAST | Direction.SOUTH_WEST:
+                x_diff = 1
+            case _:
+                x_diff = 0
+        match direction:
+            case Direction.EAST | Direction.NORTH_EAST | Direction.SOUTH_EAST:
+                y_diff = 1
+            case Direction.WEST | Direction.NORTH_WEST | Direction.SOUTH_WEST:
+                y_diff = -1
+            case _:
+                y_diff = 0
+        return LegacyCoordinate(self.x + x_diff * amount, self.y + y_diff * amount)
+
+    def neighbours(self, diagonal: bool) -> dict[Direction, LegacyCoordinate]:
+        directions = list(Direction) if diagonal else Direction.orthogonal_directions()
+        return {direction: self.step(direction) for direction in directions}
+
+
+def bench_step(coordinates: list):
+    directions = Direction.orthogonal_directions()
+    for i, co in enumerate(coordinates):
+        co.step(directions[i % 4])
+
+
+def bench_neighbours(coordinates: list):
+    for co in coordinates:
+        co.neighbours(diagonal=False)
+
+
+def bench_hash(coordinates: list):
+    set(coordinates)
+
+
+def main():
+    for name, func in (('step', bench_step), ('neighbours', bench_neighbours), ('__hash__', bench_hash)):
+        throughputs = []
+        for cls in (LegacyCoordinate, Coordinate):
+            coordinates = [cls(i // 300, i % 300) for i in range(NUMBER_OPERATIONS)]
+            timing = measure(func, coordinates, repeats=7)
+            throughputs.append(NUMBER_OPERATIONS / timing.median)
+        before, after = throughputs
+        print(f'{name}: {before / 1e6:.02f}M/s before, {after / 1e6:.02f}M/s after ({after / before:.02f}x)')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,104 @@
+"""
+Memory per obstacle candidate of day 6 part 2, with the epoch stamped visited states versus the alternatives:
+a new set per candidate, or a deep copy of the visited dict-of-sets like part 2 used to make.
+With --processes, time the whole of part 2 for every number of worker processes instead, to see how it scales.
+
+python -m benchmarks.bench_day_06 [--size 130] [--density 0.02] [--processes 1 2 4 8]
+"""
+
+import argparse
+import copy
+import random
+import statistics
+import timeit
+import tracemalloc
+from collections import defaultdict
+from collections.abc import Callable
+
+from advent_of_code.day_06 import DIRECTIONS, EXIT, VisitedStates, get_jump_table, get_offsets, is_loop, jump, part2
+from util.benchmark_util import measure
+from util.grid_util import ArrayGrid
+
+
+def generate_map(size: int, density: float, seed: int = 0) -> str:
+    rng = random.Random(seed)
+    rows = [['#' if rng.random() < density else '.' for _ in range(size)] for _ in range(size)]
+    rows[size // 2][size // 2] = '^'
+    return '\n'.join(''.join(row) for row in rows)
+
+
+def is_loop_with_set(grid: ArrayGrid, jump_table: list[list[int]], index: int, direction_index: int, obstacle: int) -> bool:
+    turns = set()
+    while True:
+        index = jump(grid, jump_table, index, direction_index, obstacle)
+        if index == EXIT:
+            return False
+        if (index, direction_index) in turns:
+            return True
+        turns.add((index, direction_index))
+        direction_index = (direction_index + 1) % 4
+
+
+def measure_candidates(grid: ArrayGrid, check: Callable[[int, int, int, dict], object]) -> tuple[list[int], list[float]]:
+    """Walk the original route, measure the peak memory (bytes) and the duration of the check of every candidate."""
+    offsets = get_offsets(grid)
+    index = grid.find('^')
+    direction_index = 0
+    positions_visited = defaultdict(set)
+    peaks = []
+    durations = []
+    while True:
+        positions_visited[index].add(DIRECTIONS[direction_index])
+        next_index = index + offsets[direction_index]
+        if grid.cells[next_index] == ArrayGrid.BORDER:
+            return peaks, durations
+        if grid.cells[next_index] == ord('#'):
+            direction_index = (direction_index + 1) % 4
+            continue
+        if next_index not in positions_visited:
+            tracemalloc.reset_peak()
+            before = tracemalloc.get_traced_memory()[0]
+            start = timeit.default_timer()
+            check(next_index, index, direction_index, positions_visited)
+            durations.append(timeit.default_timer() - start)
+            peaks.append(tracemalloc.get_traced_memory()[1] - before)
+        index = next_index
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--size', type=int, default=130)
+    parser.add_argument('--density', type=float, default=0.02)
+    parser.add_argument('--processes', type=int, nargs='*', help='time part 2 with these numbers of worker processes')
+    args = parser.parse_args()
+
+    input_data = generate_map(args.size, args.density)
+    if args.processes:
+        serial = None
+        for processes in args.processes:
+            timing = measure(part2, input_data, processes, warmup=0, repeats=3)
+            serial = serial or timing.median
+            print(f'{processes} processes: {timing}  speedup {serial / timing.median:.02f}x')
+        return
+
+    grid = ArrayGrid.from_input_string(input_data)
+    jump_table = get_jump_table(grid)
+    turns = VisitedStates(len(grid.cells))
+
+    checks = {
+        'epoch stamped bytearray': lambda obstacle, index, direction_index, _: is_loop(grid, jump_table, index, direction_index, obstacle, turns),
+        'new set per candidate': lambda obstacle, index, direction_index, _: is_loop_with_set(grid, jump_table, index, direction_index, obstacle),
+        'deep copy of the visited states (old)': lambda obstacle, index, direction_index, positions_visited: copy.deepcopy(positions_visited),
+    }
+
+    tracemalloc.start()
+    for name, check in checks.items():
+        peaks, durations = measure_candidates(grid, check)
+        print(
+            f'{name}: peak {statistics.mean(peaks) / 1024:.02f} KiB per candidate (max {max(peaks) / 1024:.02f} KiB), {statistics.mean(durations) * 1e6:.01f}us per candidate, {len(peaks)} candidates'
+        )
+    tracemalloc.stop()
+
+
+if __name__ == '__main__':
+    main()
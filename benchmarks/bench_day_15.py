@@ -0,0 +1,58 @@
+"""
+Day 15 on a synthetic warehouse with a lot of moves, one move at a time versus (direction, count) runs.
+
+python -m benchmarks.bench_day_15 [--size 50] [--moves 1000000]
+"""
+
+import argparse
+import random
+
+from advent_of_code.day_15 import execute_move_part_2, execute_straight_run, parse_input, part1, part2
+from util.benchmark_util import measure
+
+
+def generate_input(size: int, moves: int, seed: int = 0) -> str:
+    """A walled warehouse with boxes on a quarter of the cells and a few walls, and runs of 1 to 8 identical moves."""
+    rng = random.Random(seed)
+    rows = [['#' if x in (0, size - 1) or y in (0, size - 1) else rng.choices('O.#', (25, 72, 3))[0] for y in range(size)] for x in range(size)]
+    rows[size // 2][size // 2] = '@'
+    move_chars = []
+    while len(move_chars) < moves:
+        move_chars += rng.choice('<>^v') * rng.randint(1, 8)
+    move_str = ''.join(move_chars[:moves])
+    return '\n'.join(''.join(row) for row in rows) + '\n\n' + '\n'.join(move_str[i : i + 1000] for i in range(0, len(move_str), 1000))
+
+
+def part1_per_move(input_data: str) -> int:
+    grid, moves, current_position = parse_input(input_data)
+    for direction, count in moves:
+        for _ in range(count):
+            current_position = execute_straight_run(grid, current_position, direction, 1)
+    return sum(x * 100 + y for x, line in enumerate(grid) for y, char in enumerate(line) if char == 'O')
+
+
+def part2_per_move(input_data: str) -> int:
+    grid, moves, current_position = parse_input(input_data, part_2=True)
+    for direction, count in moves:
+        for _ in range(count):
+            current_position = execute_move_part_2(grid, current_position, direction)
+    return sum(x * 100 + y for x, line in enumerate(grid) for y, char in enumerate(line) if char == '[')
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--size', type=int, default=50)
+    parser.add_argument('--moves', type=int, default=1_000_000)
+    args = parser.parse_args()
+
+    input_data = generate_input(args.size, args.moves)
+
+    for name, per_move, per_run in (('part 1', part1_per_move, part1), ('part 2', part2_per_move, part2)):
+        assert per_move(input_data) == per_run(input_data)
+        per_move_timing = measure(per_move, input_data, warmup=0, repeats=3)
+        per_run_timing = measure(per_run, input_data, warmup=0, repeats=3)
+        print(f'{name}, {args.moves} moves: per move {per_move_timing.median:.02f}s, per run {per_run_timing.median:.02f}s ({per_move_timing.median / per_run_timing.median:.02f}x)')
+
+
+if __name__ == '__main__':
+    main()
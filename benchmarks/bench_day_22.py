@@ -0,0 +1,56 @@
+"""
+Secret generation of day 22, one buyer at a time in pure Python versus all buyers at once with numpy,
+step by step or with a single jump-ahead matrix.
+
+python -m benchmarks.bench_day_22 [--buyers 1000000] [--sample 1000]
+"""
+
+import argparse
+import random
+import timeit
+
+import numpy as np
+
+from advent_of_code.day_22 import STEPS, iter_secret_blocks, jump_secrets, next_secret, nth_secrets
+from util.benchmark_util import measure
+
+
+def nth_secrets_loop(seeds: list[int]) -> list[int]:
+    secrets = []
+    for secret in seeds:
+        for _ in range(STEPS):
+            secret = next_secret(secret)
+        secrets.append(secret)
+    return secrets
+
+
+def stream_secret_blocks(seeds: np.ndarray) -> int:
+    return sum(block.shape[1] for block in iter_secret_blocks(seeds))
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--buyers', type=int, default=1_000_000)
+    parser.add_argument('--sample', type=int, default=1000, help='number of buyers for the pure Python loop, which is too slow for all of them')
+    args = parser.parse_args()
+
+    rng = random.Random(0)
+    seeds = np.array([rng.randrange(1 << 24) for _ in range(args.buyers)], dtype=np.uint32)
+    sample = [int(seed) for seed in seeds[: args.sample]]
+
+    start = timeit.default_timer()
+    expected = nth_secrets_loop(sample)
+    loop_duration = (timeit.default_timer() - start) * args.buyers / len(sample)
+    assert nth_secrets(seeds)[: len(sample)].tolist() == expected
+
+    timing = measure(nth_secrets, seeds, warmup=0, repeats=3)
+    print(f'{STEPS}th secret of {args.buyers} buyers: loop {loop_duration:.02f}s (extrapolated), numpy {timing}  ({loop_duration / timing.median:.0f}x)')
+    assert jump_secrets(seeds, STEPS)[: len(sample)].tolist() == expected
+    jump_timing = measure(jump_secrets, seeds, STEPS, repeats=5)
+    print(f'{STEPS}th secret of {args.buyers} buyers with the jump-ahead matrix: {jump_timing}  ({loop_duration / jump_timing.median:.0f}x)')
+    timing = measure(stream_secret_blocks, seeds, warmup=0, repeats=1)
+    print(f'all secrets of {args.buyers} buyers, streamed in blocks of columns: {timing}')
+
+
+if __name__ == '__main__':
+    main()
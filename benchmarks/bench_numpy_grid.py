@@ -0,0 +1,75 @@
+"""
+Per cell loops over a ListGrid versus whole-grid operations on a NumpyGrid, on a large synthetic garden.
+
+python -m benchmarks.bench_numpy_grid [--size 5000]
+"""
+
+import argparse
+import random
+import timeit
+
+from util.benchmark_util import measure
+from util.grid_util import Coordinate, Direction, ListGrid, NumpyGrid
+
+
+def generate_grid(size: int, chars: str = 'ABCD', seed: int = 0) -> str:
+    rng = random.Random(seed)
+    return '\n'.join(''.join(rng.choices(chars, k=size)) for _ in range(size))
+
+
+def same_neighbour_count_loop(grid: ListGrid) -> int:
+    """Total number of (cell, neighbour) pairs with the same plant, the way day 12 does it."""
+    total = 0
+    for x in range(grid.max_x + 1):
+        for y in range(grid.max_y + 1):
+            for neighbour in Coordinate(x, y).adjacent():
+                if grid.is_in_bounds(neighbour) and grid[neighbour.x][neighbour.y] == grid[x][y]:
+                    total += 1
+    return total
+
+
+def same_neighbour_count_numpy(grid: NumpyGrid) -> int:
+    return int(grid.same_neighbour_count().sum())
+
+
+def char_neighbour_count_loop(grid: ListGrid, char: str) -> int:
+    """Total number of neighbours that are the given character, of all cells."""
+    total = 0
+    for x in range(grid.max_x + 1):
+        for y in range(grid.max_y + 1):
+            for direction in Direction:
+                neighbour = Coordinate(x, y).step(direction)
+                if grid.is_in_bounds(neighbour) and grid[neighbour.x][neighbour.y] == char:
+                    total += 1
+    return total
+
+
+def char_neighbour_count_numpy(grid: NumpyGrid, char: str) -> int:
+    return int(grid.neighbour_count(grid.mask(char), diagonal=True).sum())
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--size', type=int, default=5000)
+    args = parser.parse_args()
+
+    input_data = generate_grid(args.size)
+    list_grid = ListGrid.from_input_string(input_data)
+    numpy_grid = NumpyGrid.from_input_string(input_data)
+
+    for name, loop, vectorized, extra_args in (
+        ('same plant neighbours', same_neighbour_count_loop, same_neighbour_count_numpy, ()),
+        ('neighbours that are A', char_neighbour_count_loop, char_neighbour_count_numpy, ('A',)),
+    ):
+        # the loop is too slow to repeat
+        start = timeit.default_timer()
+        expected = loop(list_grid, *extra_args)
+        loop_duration = timeit.default_timer() - start
+        assert vectorized(numpy_grid, *extra_args) == expected
+        numpy_timing = measure(vectorized, numpy_grid, *extra_args, repeats=5)
+        speedup = loop_duration / numpy_timing.median
+        print(f'{name} on {args.size}x{args.size}: loop {loop_duration:.02f}s, numpy {numpy_timing.median:.04f}s ({speedup:.0f}x)')
+
+
+if __name__ == '__main__':
+    main()
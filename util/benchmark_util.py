@@ -0,0 +1,138 @@
+"""
+Benchmark the solutions of all days and compare them against a stored baseline.
+
+python -m util.benchmark_util [--days 6 18] [--repeats 5] [--output bench.json] [--baseline baseline.json] [--threshold 10]
+"""
+
+import argparse
+import dataclasses
+import json
+import math
+import statistics
+import sys
+import timeit
+from collections.abc import Callable, Iterable
+from pathlib import Path
+
+from util.input_util import get_input
+from util.runner_util import get_days, get_solver
+
+
+@dataclasses.dataclass
+class Timing:
+    min: float
+    median: float
+    p95: float
+    repeats: int
+
+    @property
+    def ops(self) -> float:
+        """Number of runs per second, based on the median."""
+        return 1 / self.median if self.median else math.inf
+
+    def __str__(self) -> str:
+        return f'min {self.min:.04f}s  median {self.median:.04f}s  p95 {self.p95:.04f}s  {self.ops:.02f} ops/s'
+
+
+def percentile(durations: list[float], percent: float) -> float:
+    """Nearest rank percentile."""
+    durations = sorted(durations)
+    rank = math.ceil(percent / 100 * len(durations))
+    return durations[max(rank, 1) - 1]
+
+
+def measure(func: Callable, *args, warmup: int = 1, repeats: int = 5) -> Timing:
+    for _ in range(warmup):
+        func(*args)
+
+    durations = []
+    for _ in range(repeats):
+        start = timeit.default_timer()
+        func(*args)
+        durations.append(timeit.default_timer() - start)
+
+    return Timing(
+        min=min(durations),
+        median=statistics.median(durations),
+        p95=percentile(durations, 95),
+        repeats=repeats,
+    )
+
+
+def benchmark(days: Iterable[int], warmup: int = 1, repeats: int = 5) -> tuple[dict[str, Timing], dict[str, str]]:
+    """
+    Time both parts of every given day. The keys look like `day_06.part2`.
+    A part that raises is left out of the timings and reported in the errors instead, so the other days still count.
+    """
+    timings = {}
+    errors = {}
+    for day in days:
+        try:
+            input_data = get_input(day)
+        except FileNotFoundError:
+            print(f'day_{day:02d}: no input, skipped')
+            continue
+        for part in (1, 2):
+            name = f'day_{day:02d}.part{part}'
+            try:
+                timings[name] = measure(get_solver(day, part), input_data, warmup=warmup, repeats=repeats)
+            except Exception as e:
+                errors[name] = f'{type(e).__name__}: {e}'
+                print(f'{name}: error: {errors[name]}')
+                continue
+            print(f'{name}: {timings[name]}')
+    return timings, errors
+
+
+def write_results(timings: dict[str, Timing], path: Path):
+    path.write_text(json.dumps({name: dataclasses.asdict(timing) for name, timing in timings.items()}, indent=2))
+
+
+def read_results(path: Path) -> dict[str, Timing]:
+    return {name: Timing(**timing) for name, timing in json.loads(path.read_text()).items()}
+
+
+def get_regressions(timings: dict[str, Timing], baseline: dict[str, Timing], threshold: float) -> dict[str, float]:
+    """
+    All benchmarks of which the median got slower than the baseline by more than `threshold` percent.
+    A baseline median of 0 can't be compared in percent, so it is skipped.
+    """
+    regressions = {}
+    for name, timing in timings.items():
+        if name in baseline and baseline[name].median > 0:
+            slowdown = (timing.median / baseline[name].median - 1) * 100
+            if slowdown > threshold:
+                regressions[name] = slowdown
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark the solutions of all days.')
+    parser.add_argument('--days', type=int, nargs='*', help='only benchmark these days (default: all of them)')
+    parser.add_argument('--warmup', type=int, default=1, help='untimed runs before the timed ones')
+    parser.add_argument('--repeats', type=int, default=5, help='number of timed runs')
+    parser.add_argument('--output', type=Path, help='write the results to this JSON file')
+    parser.add_argument('--baseline', type=Path, help='compare the results against this JSON file')
+    parser.add_argument('--threshold', type=float, default=10, help='slowdown in percent that counts as a regression')
+    args = parser.parse_args()
+
+    timings, errors = benchmark(args.days or get_days(), args.warmup, args.repeats)
+    if args.output:
+        write_results(timings, args.output)
+
+    regressions = {}
+    if args.baseline:
+        regressions = get_regressions(timings, read_results(args.baseline), args.threshold)
+        for name, slowdown in regressions.items():
+            print(f'regression: {name} is {slowdown:.01f}% slower than the baseline')
+        if not regressions:
+            print(f'no regressions above {args.threshold}%')
+
+    if errors:
+        print(f'{len(errors)} parts failed: {", ".join(errors)}')
+    if errors or regressions:
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
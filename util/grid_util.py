@@ -3,10 +3,16 @@ from __future__ import annotations
 import abc
 import dataclasses
 from collections import UserDict, UserList
-from collections.abc import Callable, Iterable
+from collections.abc import Callable, Iterable, Iterator, MutableMapping
 from enum import Enum
 from typing import Any
 
+try:
+    import numpy as np
+except ImportError:
+    # only needed for NumpyGrid
+    np = None
+
 
 class Direction(Enum):
     NORTH = 'north'
@@ -38,41 +44,61 @@ class Direction(Enum):
 
     @staticmethod
     def opposite(direction: Direction) -> Direction:
-        return {
-            Direction.NORTH: Direction.SOUTH,
-            Direction.SOUTH: Direction.NORTH,
-            Direction.WEST: Direction.EAST,
-            Direction.EAST: Direction.WEST,
-            Direction.NORTH_EAST: Direction.SOUTH_WEST,
-            Direction.SOUTH_WEST: Direction.NORTH_EAST,
-            Direction.NORTH_WEST: Direction.SOUTH_EAST,
-            Direction.SOUTH_EAST: Direction.NORTH_WEST,
-        }[direction]
+        return _OPPOSITE[direction]
 
     @staticmethod
     def rotate(direction: Direction, left: bool) -> Direction:
-        mapping = {
-            Direction.NORTH: Direction.EAST,
-            Direction.SOUTH: Direction.WEST,
-            Direction.WEST: Direction.NORTH,
-            Direction.EAST: Direction.SOUTH,
-            Direction.NORTH_EAST: Direction.SOUTH_EAST,
-            Direction.SOUTH_WEST: Direction.NORTH_WEST,
-            Direction.NORTH_WEST: Direction.NORTH_EAST,
-            Direction.SOUTH_EAST: Direction.SOUTH_WEST,
-        }
-        if left:
-            mapping = {v: k for k, v in mapping.items()}
-        return mapping[direction]
+        return _ROTATE_LEFT[direction] if left else _ROTATE_RIGHT[direction]
 
     def __lt__(self, other):
         # not really useful, but this allows for sorting
         return self.value < other.value
 
 
-@dataclasses.dataclass(frozen=True)
+_OPPOSITE = {
+    Direction.NORTH: Direction.SOUTH,
+    Direction.SOUTH: Direction.NORTH,
+    Direction.WEST: Direction.EAST,
+    Direction.EAST: Direction.WEST,
+    Direction.NORTH_EAST: Direction.SOUTH_WEST,
+    Direction.SOUTH_WEST: Direction.NORTH_EAST,
+    Direction.NORTH_WEST: Direction.SOUTH_EAST,
+    Direction.SOUTH_EAST: Direction.NORTH_WEST,
+}
+
+_ROTATE_RIGHT = {
+    Direction.NORTH: Direction.EAST,
+    Direction.SOUTH: Direction.WEST,
+    Direction.WEST: Direction.NORTH,
+    Direction.EAST: Direction.SOUTH,
+    Direction.NORTH_EAST: Direction.SOUTH_EAST,
+    Direction.SOUTH_WEST: Direction.NORTH_WEST,
+    Direction.NORTH_WEST: Direction.NORTH_EAST,
+    Direction.SOUTH_EAST: Direction.SOUTH_WEST,
+}
+
+_ROTATE_LEFT = {v: k for k, v in _ROTATE_RIGHT.items()}
+
+# (x, y) difference of a single step in every direction
+DIRECTION_TO_DELTA: dict[Direction, tuple[int, int]] = {
+    Direction.NORTH: (-1, 0),
+    Direction.EAST: (0, 1),
+    Direction.SOUTH: (1, 0),
+    Direction.WEST: (0, -1),
+    Direction.NORTH_WEST: (-1, -1),
+    Direction.NORTH_EAST: (-1, 1),
+    Direction.SOUTH_EAST: (1, 1),
+    Direction.SOUTH_WEST: (1, -1),
+}
+
+_ORTHOGONAL_DELTAS = tuple((direction, *DIRECTION_TO_DELTA[direction]) for direction in Direction.orthogonal_directions())
+_ALL_DELTAS = tuple((direction, *DIRECTION_TO_DELTA[direction]) for direction in Direction)
+
+
 class Coordinate:
     """
+    Immutable and hashable like a frozen dataclass, but slotted and without the dataclass overhead.
+
     Origin is upper left corner.
 
     +------->
@@ -82,8 +108,30 @@ class Coordinate:
     v (x)
     """
 
-    x: int
-    y: int
+    __slots__ = ('x', 'y')
+
+    def __init__(self, x: int, y: int):
+        # write the slots directly, __setattr__ is blocked
+        _set_x(self, x)
+        _set_y(self, y)
+
+    def __setattr__(self, name: str, value: Any):
+        raise dataclasses.FrozenInstanceError(f'cannot assign to field {name!r}')
+
+    def __delattr__(self, name: str):
+        raise dataclasses.FrozenInstanceError(f'cannot delete field {name!r}')
+
+    def __reduce__(self):
+        return Coordinate, (self.x, self.y)
+
+    def __eq__(self, other):
+        if other.__class__ is not Coordinate:
+            return NotImplemented
+        return self.x == other.x and self.y == other.y
+
+    def __hash__(self) -> int:
+        # same hash as the frozen dataclass this used to be
+        return hash((self.x, self.y))
 
     def __repr__(self) -> str:
         return f'({self.x}, {self.y})'
@@ -93,39 +141,36 @@ class Coordinate:
             raise NotImplementedError()
         return (self.x, self.y) < (other.x, other.y)
 
-    def step(self, direction: Direction, amount: int = 1):
-        assert isinstance(direction, Direction)
-        match direction:
-            case Direction.NORTH | Direction.NORTH_EAST | Direction.NORTH_WEST:
-                x_diff = -1
-            case Direction.SOUTH | Direction.SOUTH_EAST | Direction.SOUTH_WEST:
-                x_diff = 1
-            case _:
-                x_diff = 0
-        match direction:
-            case Direction.EAST | Direction.NORTH_EAST | Direction.SOUTH_EAST:
-                y_diff = 1
-            case Direction.WEST | Direction.NORTH_WEST | Direction.SOUTH_WEST:
-                y_diff = -1
-            case _:
-                y_diff = 0
+    def step(self, direction: Direction, amount: int = 1) -> Coordinate:
+        x_diff, y_diff = DIRECTION_TO_DELTA[direction]
         return Coordinate(self.x + x_diff * amount, self.y + y_diff * amount)
 
     def steps(self, direction: Direction) -> Iterable[Coordinate]:
-        current_position = self
+        x_diff, y_diff = DIRECTION_TO_DELTA[direction]
+        x, y = self.x, self.y
         while True:
-            current_position = current_position.step(direction)
-            yield current_position
+            x += x_diff
+            y += y_diff
+            yield Coordinate(x, y)
 
     def neighbours(self, diagonal: bool) -> dict[Direction, Coordinate]:
-        directions = list(Direction) if diagonal else Direction.orthogonal_directions()
-        return {direction: self.step(direction) for direction in directions}
+        x, y = self.x, self.y
+        return {direction: Coordinate(x + x_diff, y + y_diff) for direction, x_diff, y_diff in (_ALL_DELTAS if diagonal else _ORTHOGONAL_DELTAS)}
+
+    def adjacent(self, diagonal: bool = False) -> tuple[Coordinate, ...]:
+        """Like neighbours(), without the directions."""
+        x, y = self.x, self.y
+        return tuple(Coordinate(x + x_diff, y + y_diff) for _, x_diff, y_diff in (_ALL_DELTAS if diagonal else _ORTHOGONAL_DELTAS))
 
     @staticmethod
     def manhattan_distance(co_1: Coordinate, co_2: Coordinate) -> int:
         return abs(co_1.x - co_2.x) + abs(co_1.y - co_2.y)
 
 
+_set_x = Coordinate.x.__set__
+_set_y = Coordinate.y.__set__
+
+
 class Grid(abc.ABC):
     @property
     @abc.abstractmethod
@@ -197,6 +242,165 @@ class DictGrid(Grid, UserDict):
         return min(co.y for co in self.data)
 
 
+_EMPTY = object()
+
+
+class SparseGrid(Grid, MutableMapping):
+    """
+    Sparse grid for huge or unbounded coordinate spaces, mapping coordinates to values like DictGrid does.
+
+    The cells are stored in square chunks, so cells that are close to each other are stored together.
+    The bounding box is kept up to date on every insert and delete, so the bounds and is_in_bounds don't scan all cells.
+
+    Origin is upper left corner.
+
+    +------->
+    |      (y)
+    |
+    |
+    v (x)
+    """
+
+    CHUNK_BITS = 4
+    CHUNK_SIZE = 1 << CHUNK_BITS
+    CHUNK_MASK = CHUNK_SIZE - 1
+
+    def __init__(self, data: dict[Coordinate, Any] | None = None):
+        self.chunks: dict[tuple[int, int], list] = {}
+        self.chunk_counts: dict[tuple[int, int], int] = {}
+        # number of cells per row/column, used to update the bounds when cells get deleted
+        self.x_counts: dict[int, int] = {}
+        self.y_counts: dict[int, int] = {}
+        self._bounds: list[int | None] = [None, None, None, None]
+        self._size = 0
+        if data:
+            self.update(data)
+
+    def _locate(self, co: Coordinate) -> tuple[tuple[int, int], int]:
+        return (co.x >> self.CHUNK_BITS, co.y >> self.CHUNK_BITS), ((co.x & self.CHUNK_MASK) << self.CHUNK_BITS) | (co.y & self.CHUNK_MASK)
+
+    def __getitem__(self, co: Coordinate) -> Any:
+        chunk_key, index = self._locate(co)
+        chunk = self.chunks.get(chunk_key)
+        if chunk is None or chunk[index] is _EMPTY:
+            raise KeyError(co)
+        return chunk[index]
+
+    def __setitem__(self, co: Coordinate, value: Any):
+        chunk_key, index = self._locate(co)
+        chunk = self.chunks.get(chunk_key)
+        if chunk is None:
+            chunk = self.chunks[chunk_key] = [_EMPTY] * (self.CHUNK_SIZE * self.CHUNK_SIZE)
+            self.chunk_counts[chunk_key] = 0
+        if chunk[index] is _EMPTY:
+            self.chunk_counts[chunk_key] += 1
+            self._size += 1
+            self._add_to_bounds(co)
+        chunk[index] = value
+
+    def __delitem__(self, co: Coordinate):
+        chunk_key, index = self._locate(co)
+        chunk = self.chunks.get(chunk_key)
+        if chunk is None or chunk[index] is _EMPTY:
+            raise KeyError(co)
+        chunk[index] = _EMPTY
+        self.chunk_counts[chunk_key] -= 1
+        self._size -= 1
+        if not self.chunk_counts[chunk_key]:
+            del self.chunks[chunk_key]
+            del self.chunk_counts[chunk_key]
+        self._remove_from_bounds(co)
+
+    def __iter__(self) -> Iterator[Coordinate]:
+        for co, _ in self.items_in_chunks(list(self.chunks)):
+            yield co
+
+    def __len__(self) -> int:
+        return self._size
+
+    def __contains__(self, co: object) -> bool:
+        if not isinstance(co, Coordinate):
+            return False
+        chunk_key, index = self._locate(co)
+        chunk = self.chunks.get(chunk_key)
+        return chunk is not None and chunk[index] is not _EMPTY
+
+    def _add_to_bounds(self, co: Coordinate):
+        self.x_counts[co.x] = self.x_counts.get(co.x, 0) + 1
+        self.y_counts[co.y] = self.y_counts.get(co.y, 0) + 1
+        min_x, max_x, min_y, max_y = self._bounds
+        if min_x is None:
+            self._bounds = [co.x, co.x, co.y, co.y]
+        else:
+            self._bounds = [min(min_x, co.x), max(max_x, co.x), min(min_y, co.y), max(max_y, co.y)]
+
+    def _remove_from_bounds(self, co: Coordinate):
+        # only when the last cell of an outer row/column disappears, the bound has to be looked up again
+        self.x_counts[co.x] -= 1
+        if not self.x_counts[co.x]:
+            del self.x_counts[co.x]
+            if co.x in self._bounds[:2]:
+                self._bounds[:2] = [min(self.x_counts), max(self.x_counts)] if self.x_counts else [None, None]
+        self.y_counts[co.y] -= 1
+        if not self.y_counts[co.y]:
+            del self.y_counts[co.y]
+            if co.y in self._bounds[2:]:
+                self._bounds[2:] = [min(self.y_counts), max(self.y_counts)] if self.y_counts else [None, None]
+
+    @property
+    def min_x(self) -> int:
+        return self._bounds[0]
+
+    @property
+    def max_x(self) -> int:
+        return self._bounds[1]
+
+    @property
+    def min_y(self) -> int:
+        return self._bounds[2]
+
+    @property
+    def max_y(self) -> int:
+        return self._bounds[3]
+
+    def is_in_bounds(self, co: Coordinate) -> bool:
+        min_x, max_x, min_y, max_y = self._bounds
+        return min_x is not None and min_x <= co.x <= max_x and min_y <= co.y <= max_y
+
+    def items_in_chunks(self, chunk_keys: Iterable[tuple[int, int]]) -> Iterator[tuple[Coordinate, Any]]:
+        for chunk_x, chunk_y in chunk_keys:
+            chunk = self.chunks.get((chunk_x, chunk_y))
+            if chunk is None:
+                continue
+            base_x = chunk_x << self.CHUNK_BITS
+            base_y = chunk_y << self.CHUNK_BITS
+            for index, value in enumerate(chunk):
+                if value is not _EMPTY:
+                    yield Coordinate(base_x + (index >> self.CHUNK_BITS), base_y + (index & self.CHUNK_MASK)), value
+
+    def region(self, min_x: int, max_x: int, min_y: int, max_y: int) -> Iterator[tuple[Coordinate, Any]]:
+        """All cells within the rectangle (bounds included), chunk by chunk."""
+        chunk_xs = range(min_x >> self.CHUNK_BITS, (max_x >> self.CHUNK_BITS) + 1)
+        chunk_ys = range(min_y >> self.CHUNK_BITS, (max_y >> self.CHUNK_BITS) + 1)
+        if len(chunk_xs) * len(chunk_ys) <= len(self.chunks):
+            chunk_keys = ((chunk_x, chunk_y) for chunk_x in chunk_xs for chunk_y in chunk_ys)
+        else:
+            # the region is mostly empty, only look at the chunks that exist
+            chunk_keys = sorted(key for key in self.chunks if key[0] in chunk_xs and key[1] in chunk_ys)
+        for co, value in self.items_in_chunks(chunk_keys):
+            if min_x <= co.x <= max_x and min_y <= co.y <= max_y:
+                yield co, value
+
+    def to_string(self, filler: str = '.') -> list[str]:
+        lines = []
+        for x in range(self.min_x, self.max_x + 1):
+            line = [filler] * (self.max_y - self.min_y + 1)
+            for co, value in self.region(x, x, self.min_y, self.max_y):
+                line[co.y - self.min_y] = value.value if isinstance(value, Enum) else str(value)
+            lines.append(''.join(line))
+        return lines
+
+
 class ListGrid(Grid, UserList):
     """
     Origin is upper left corner.
@@ -238,3 +442,210 @@ class ListGrid(Grid, UserList):
     @classmethod
     def from_input_string(cls, input_data: str, cast: Callable[[str], Any] = lambda x: x) -> ListGrid:
         return cls([[cast(char) for char in line] for line in input_data.splitlines()])
+
+
+class ArrayGrid(Grid):
+    """
+    Flat bytearray of characters, surrounded by a border of sentinel cells.
+
+    Cells are addressed by their integer index in the bytearray. Stepping a single cell from any cell inside the grid
+    never leaves the bytearray, it either lands on another cell or on the border. So instead of checking bounds,
+    check whether `grid.cells[index] == ArrayGrid.BORDER`.
+
+    Origin is upper left corner.
+
+    +------->
+    |      (y)
+    |
+    |
+    v (x)
+    """
+
+    BORDER = 0
+
+    def __init__(self, height: int, width: int, fill: str = '.', cells: bytearray | memoryview | None = None):
+        """Either fill a new grid, or wrap existing cells (border included), like a buffer in shared memory."""
+        self.height = height
+        self.width = width
+        self.stride = width + 2
+        if cells is not None:
+            self.cells = cells
+        else:
+            self.cells = bytearray([self.BORDER]) * ((height + 2) * self.stride)
+            row = fill.encode() * width
+            for x in range(height):
+                start = self.index(x, 0)
+                self.cells[start : start + width] = row
+        self.offsets: dict[Direction, int] = {
+            Direction.NORTH: -self.stride,
+            Direction.SOUTH: self.stride,
+            Direction.EAST: 1,
+            Direction.WEST: -1,
+            Direction.NORTH_EAST: 1 - self.stride,
+            Direction.NORTH_WEST: -1 - self.stride,
+            Direction.SOUTH_EAST: 1 + self.stride,
+            Direction.SOUTH_WEST: -1 + self.stride,
+        }
+        self.orthogonal_offsets = tuple(self.offsets[direction] for direction in Direction.orthogonal_directions())
+        self.all_offsets = tuple(self.offsets.values())
+
+    @property
+    def min_x(self) -> int:
+        return 0
+
+    @property
+    def max_x(self) -> int:
+        return self.height - 1
+
+    @property
+    def min_y(self) -> int:
+        return 0
+
+    @property
+    def max_y(self) -> int:
+        return self.width - 1
+
+    def index(self, x: int, y: int) -> int:
+        return (x + 1) * self.stride + y + 1
+
+    def coordinate(self, index: int) -> Coordinate:
+        x, y = divmod(index, self.stride)
+        return Coordinate(x - 1, y - 1)
+
+    def indices(self) -> Iterable[int]:
+        """All indices inside the border, row by row."""
+        for x in range(self.height):
+            start = self.index(x, 0)
+            yield from range(start, start + self.width)
+
+    def find(self, char: str) -> int:
+        """Index of the first occurrence of the character."""
+        # wrapped cells like a memoryview can't search themselves
+        cells = self.cells if isinstance(self.cells, bytearray) else bytes(self.cells)
+        index = cells.find(char.encode())
+        if index < 0:
+            raise ValueError(f'{char} not in grid')
+        return index
+
+    def __getitem__(self, key: int | Coordinate) -> str:
+        if isinstance(key, Coordinate):
+            key = self.index(key.x, key.y)
+        return chr(self.cells[key])
+
+    def __setitem__(self, key: int | Coordinate, value: str):
+        if isinstance(key, Coordinate):
+            key = self.index(key.x, key.y)
+        self.cells[key] = ord(value)
+
+    def to_string(self, filler: str = '.') -> list[str]:
+        return [self.cells[self.index(x, 0) : self.index(x, self.width)].decode() for x in range(self.height)]
+
+    @classmethod
+    def from_input_string(cls, input_data: str) -> ArrayGrid:
+        lines = input_data.splitlines()
+        grid = cls(len(lines), len(lines[0]))
+        for x, line in enumerate(lines):
+            start = grid.index(x, 0)
+            grid.cells[start : start + grid.width] = line.encode()
+        return grid
+
+
+class NumpyGrid(Grid):
+    """
+    Grid of character codes in a 2D numpy array, for whole-grid operations instead of per cell loops.
+    Requires numpy, which is an optional dependency.
+
+    Origin is upper left corner.
+
+    +------->
+    |      (y)
+    |
+    |
+    v (x)
+    """
+
+    def __init__(self, array: np.ndarray):
+        if np is None:
+            raise ImportError('NumpyGrid requires numpy')
+        self.array = array
+
+    @property
+    def min_x(self) -> int:
+        return 0
+
+    @property
+    def max_x(self) -> int:
+        return self.array.shape[0] - 1
+
+    @property
+    def min_y(self) -> int:
+        return 0
+
+    @property
+    def max_y(self) -> int:
+        return self.array.shape[1] - 1
+
+    def mask(self, chars: str) -> np.ndarray:
+        """Boolean array, True where the cell is any of the characters."""
+        return np.isin(self.array, np.frombuffer(chars.encode(), dtype=np.uint8))
+
+    def digits(self) -> np.ndarray:
+        return self.array.astype(np.int8) - ord('0')
+
+    @staticmethod
+    def overlap(direction: Direction, shape: tuple[int, int]) -> tuple[tuple[slice, slice], tuple[slice, slice]]:
+        """
+        Slices (cells, neighbours) such that array[neighbours] are the neighbours in the given direction of array[cells].
+        Both are views of the same shape, the cells without a neighbour in that direction are left out.
+        """
+        height, width = shape
+        x_diff, y_diff = DIRECTION_TO_DELTA[direction]
+        cells = (slice(max(0, -x_diff), height - max(0, x_diff)), slice(max(0, -y_diff), width - max(0, y_diff)))
+        neighbours = (slice(max(0, x_diff), height + min(0, x_diff)), slice(max(0, y_diff), width + min(0, y_diff)))
+        return cells, neighbours
+
+    def shifted(self, direction: Direction, fill: Any = 0, array: np.ndarray | None = None) -> np.ndarray:
+        """For every cell, the value of its neighbour in the given direction. Cells at the edge get the fill value."""
+        array = self.array if array is None else array
+        result = np.full_like(array, fill)
+        cells, neighbours = self.overlap(direction, array.shape)
+        result[cells] = array[neighbours]
+        return result
+
+    def stencil(self, kernel: np.ndarray, array: np.ndarray | None = None, fill: Any = 0) -> np.ndarray:
+        """
+        Weighted sum of every cell and its surroundings, the kernel is centered on the cell (a correlation).
+        Cells outside the grid count as the fill value.
+        """
+        array = self.array if array is None else array
+        kernel = np.asarray(kernel)
+        pad_x, pad_y = kernel.shape[0] // 2, kernel.shape[1] // 2
+        padded = np.pad(array, ((pad_x, pad_x), (pad_y, pad_y)), constant_values=fill)
+        height, width = array.shape
+        result = np.zeros(array.shape, dtype=np.result_type(array.dtype, kernel.dtype, np.int64))
+        for (i, j), weight in np.ndenumerate(kernel):
+            if weight:
+                result += weight * padded[i : i + height, j : j + width]
+        return result
+
+    def neighbour_count(self, mask: np.ndarray, diagonal: bool = False) -> np.ndarray:
+        """For every cell, the number of neighbours for which the mask is True."""
+        kernel = np.ones((3, 3), dtype=np.int64) if diagonal else np.array([[0, 1, 0], [1, 0, 1], [0, 1, 0]])
+        kernel[1, 1] = 0
+        return self.stencil(kernel, mask.astype(np.int64))
+
+    def same_neighbour_count(self, diagonal: bool = False) -> np.ndarray:
+        """For every cell, the number of neighbours with the same value."""
+        count = np.zeros(self.array.shape, dtype=np.int64)
+        for direction in Direction if diagonal else Direction.orthogonal_directions():
+            cells, neighbours = self.overlap(direction, self.array.shape)
+            count[cells] += self.array[cells] == self.array[neighbours]
+        return count
+
+    def to_string(self, filler: str = '.') -> list[str]:
+        return [row.tobytes().decode() for row in self.array]
+
+    @classmethod
+    def from_input_string(cls, input_data: str) -> NumpyGrid:
+        lines = input_data.splitlines()
+        return cls(np.frombuffer(''.join(lines).encode(), dtype=np.uint8).reshape(len(lines), len(lines[0])).copy())
@@ -1,16 +1,61 @@
+import functools
+import mmap
 import sys
+from collections.abc import Callable, Iterator
 from pathlib import Path
+from typing import Any
 
+INPUT_DIRECTORY = Path(__file__).parent.parent / 'input'
 
-def get_input() -> str:
-    """Parse the day from the script name, open the corresponding input file."""
-    script_file_name = Path(sys.argv[0]).name
 
-    try:
-        # Only look at the digits in the file name, combine those
-        day_number = int(''.join(c for c in script_file_name if c.isdigit()))
-    except ValueError:
-        raise ValueError(f'Unexpected script name: {script_file_name}')
+def get_input_path(day: int | None = None, path: Path | str | None = None) -> Path:
+    """An explicit path wins over an explicit day. If neither is given, parse the day from the script name."""
+    if path is not None:
+        return Path(path).resolve()
 
-    input_file = Path(__file__).parent.parent / 'input' / f'{day_number:02d}.txt'
-    return input_file.read_text().strip('\n')
+    if day is None:
+        script_file_name = Path(sys.argv[0]).name
+
+        try:
+            # Only look at the digits in the file name, combine those
+            day = int(''.join(c for c in script_file_name if c.isdigit()))
+        except ValueError:
+            raise ValueError(f'Unexpected script name: {script_file_name}')
+
+    return INPUT_DIRECTORY / f'{day:02d}.txt'
+
+
+@functools.cache
+def _read_input(path: Path) -> str:
+    return path.read_text().strip('\n')
+
+
+def get_input(day: int | None = None, path: Path | str | None = None) -> str:
+    """The whole input as a string, without leading or trailing newlines. The file is only read once per process."""
+    return _read_input(get_input_path(day, path))
+
+
+def get_input_bytes(day: int | None = None, path: Path | str | None = None) -> mmap.mmap:
+    """A read-only memory map of the input file, as is, so large inputs don't get copied into memory."""
+    with open(get_input_path(day, path), 'rb') as f:
+        return mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+
+def iter_input_lines(day: int | None = None, path: Path | str | None = None) -> Iterator[str]:
+    """Lazily read the input line by line, without the newlines."""
+    with open(get_input_path(day, path)) as f:
+        for line in f:
+            yield line.rstrip('\n')
+
+
+@functools.cache
+def _parse_input(parser: Callable[[str], Any], path: Path) -> Any:
+    return parser(_read_input(path))
+
+
+def get_parsed_input(parser: Callable[[str], Any], day: int | None = None, path: Path | str | None = None) -> Any:
+    """
+    The result of applying the parser to the input, cached per process.
+    This way part 1 and part 2 can share the parsing, as long as they don't modify the result.
+    """
+    return _parse_input(parser, get_input_path(day, path))
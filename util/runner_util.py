@@ -0,0 +1,122 @@
+"""
+Run the solutions of all days in a single process pool.
+
+python -m util.runner_util [--days 6 18] [--workers 8] [--timeout 60]
+"""
+
+import argparse
+import dataclasses
+import importlib
+import os
+import pkgutil
+import re
+import signal
+import timeit
+from collections.abc import Iterable, Iterator
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from typing import Any
+
+import advent_of_code
+from util.input_util import get_input
+
+# These take by far the longest, so they get scheduled first
+SLOW_DAYS = (6, 18, 21, 22)
+
+
+class SolverTimeout(Exception):
+    pass
+
+
+@dataclasses.dataclass
+class SolverResult:
+    day: int
+    part: int
+    solution: Any = None
+    duration: float = 0
+    error: str | None = None
+
+    def __str__(self) -> str:
+        outcome = f'error: {self.error}' if self.error else self.solution
+        return f'day {self.day:02d} part {self.part}: {outcome} ({self.duration:.02f}s)'
+
+
+def get_days() -> list[int]:
+    """All days for which there is a module in the advent_of_code package."""
+    return sorted(
+        int(match.group(1))
+        for module in pkgutil.iter_modules(advent_of_code.__path__)
+        if (match := re.fullmatch(r'day_([0-9]{2})', module.name))
+    )  # fmt: skip
+
+
+def get_solver(day: int, part: int):
+    module = importlib.import_module(f'{advent_of_code.__name__}.day_{day:02d}')
+    return getattr(module, f'part{part}')
+
+
+def schedule(days: Iterable[int]) -> list[tuple[int, int]]:
+    """All (day, part) jobs, the slowest ones first so they don't end up being the tail of the run."""
+    jobs = [(day, part) for day in days for part in (1, 2)]
+    return sorted(jobs, key=lambda job: (job[0] not in SLOW_DAYS, -job[1], job[0]))
+
+
+def _raise_timeout(*args):
+    raise SolverTimeout()
+
+
+def solve(day: int, part: int, timeout: float | None = None) -> SolverResult:
+    """Run a single part of a single day. This is executed in a worker process."""
+    result = SolverResult(day, part)
+    try:
+        solver = get_solver(day, part)
+        input_data = get_input(day)
+    except Exception as e:
+        result.error = f'{type(e).__name__}: {e}'
+        return result
+
+    if timeout:
+        signal.signal(signal.SIGALRM, _raise_timeout)
+        signal.setitimer(signal.ITIMER_REAL, timeout)
+    start = timeit.default_timer()
+    try:
+        result.solution = solver(input_data)
+    except SolverTimeout:
+        result.error = f'exceeded the time budget of {timeout}s'
+    except Exception as e:
+        result.error = f'{type(e).__name__}: {e}'
+    finally:
+        if timeout:
+            signal.setitimer(signal.ITIMER_REAL, 0)
+        result.duration = timeit.default_timer() - start
+    return result
+
+
+def run(days: Iterable[int], workers: int | None = None, timeout: float | None = None) -> Iterator[SolverResult]:
+    """Solve all parts of the given days in parallel, yielding the results as soon as they are done."""
+    jobs = schedule(days)
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        futures = [executor.submit(solve, day, part, timeout) for day, part in jobs]
+        for future in as_completed(futures):
+            yield future.result()
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Run the solutions of all days in parallel.')
+    parser.add_argument('--days', type=int, nargs='*', help='only run these days (default: all of them)')
+    parser.add_argument('--workers', type=int, default=os.cpu_count(), help='number of worker processes')
+    parser.add_argument('--timeout', type=float, default=None, help='time budget per part, in seconds')
+    args = parser.parse_args()
+
+    start = timeit.default_timer()
+    results = []
+    for result in run(args.days or get_days(), args.workers, args.timeout):
+        print(result)
+        results.append(result)
+
+    duration = timeit.default_timer() - start
+    failures = sum(result.error is not None for result in results)
+    print(f'\nsolved {len(results) - failures}/{len(results)} parts in {duration:.02f}s')
+
+
+if __name__ == '__main__':
+    main()
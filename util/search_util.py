@@ -0,0 +1,164 @@
+"""
+Graph searches over integer state ids.
+
+The states are numbered 0..size-1 by the caller, for example `x * width + y` for a grid or
+`(x * width + y) * 4 + direction` when the direction is part of the state. Distances and parents are kept in flat lists
+indexed by state id instead of dicts of Coordinates.
+"""
+
+import dataclasses
+import heapq
+import math
+from collections import deque
+from collections.abc import Callable, Iterable
+
+from util.timer_util import profiler
+
+NO_PARENT = -1
+
+
+@dataclasses.dataclass
+class SearchResult:
+    # math.inf for states that weren't reached
+    distances: list[float]
+    # the state we came from on a shortest path, NO_PARENT for the starts and unreached states
+    parents: list[int]
+    # all states we can come from on a shortest path, only when searching for all paths
+    predecessors: list[list[int] | None] | None = None
+    # the first goal state that got reached, if any
+    goal: int | None = None
+
+    def path(self, state: int) -> list[int]:
+        """A shortest path from a start to the given state, both included."""
+        path = [state]
+        while self.parents[path[-1]] != NO_PARENT:
+            path.append(self.parents[path[-1]])
+        return path[::-1]
+
+    def states_on_shortest_paths(self, states: Iterable[int]) -> set[int]:
+        """All states on any shortest path to the given states, by walking the predecessors."""
+        assert self.predecessors is not None, 'search with all_paths=True'
+        seen = set(states)
+        to_explore = list(seen)
+        while to_explore:
+            for predecessor in self.predecessors[to_explore.pop()] or ():
+                if predecessor not in seen:
+                    seen.add(predecessor)
+                    to_explore.append(predecessor)
+        return seen
+
+
+def bfs(
+    starts: Iterable[int],
+    neighbours: Callable[[int], Iterable[int]],
+    size: int,
+    is_goal: Callable[[int], bool] | None = None,
+    all_paths: bool = False,
+) -> SearchResult:
+    """Breadth first search, for when every step costs 1. Stops at the first goal, unless all paths are needed."""
+    distances = [math.inf] * size
+    parents = [NO_PARENT] * size
+    predecessors = [None] * size if all_paths else None
+    result = SearchResult(distances, parents, predecessors)
+
+    queue = deque()
+    for start in starts:
+        distances[start] = 0
+        queue.append(start)
+
+    popped = 0
+    while queue:
+        state = queue.popleft()
+        popped += 1
+        distance = distances[state]
+
+        if result.goal is not None and distance > distances[result.goal]:
+            break
+        if is_goal is not None and is_goal(state):
+            if result.goal is None:
+                result.goal = state
+            if not all_paths:
+                break
+            continue
+
+        next_distance = distance + 1
+        for next_state in neighbours(state):
+            if next_distance < distances[next_state]:
+                distances[next_state] = next_distance
+                parents[next_state] = state
+                if all_paths:
+                    predecessors[next_state] = [state]
+                queue.append(next_state)
+            elif all_paths and next_distance == distances[next_state]:
+                predecessors[next_state].append(state)
+
+    profiler.count('search states', popped)
+    return result
+
+
+def dijkstra(
+    starts: Iterable[int],
+    neighbours: Callable[[int], Iterable[tuple[int, float]]],
+    size: int,
+    is_goal: Callable[[int], bool] | None = None,
+    heuristic: Callable[[int], float] | None = None,
+    all_paths: bool = False,
+) -> SearchResult:
+    """
+    Dijkstra, or A* when a heuristic is given. neighbours() yields (next state, cost) pairs.
+    The heuristic has to be consistent (never drop by more than the cost of a step) for the distances to be exact.
+    Stops at the first goal, unless all paths are needed: then it stops once nothing can reach a goal as cheap anymore.
+    """
+    distances = [math.inf] * size
+    parents = [NO_PARENT] * size
+    predecessors = [None] * size if all_paths else None
+    result = SearchResult(distances, parents, predecessors)
+
+    queue: list[tuple[float, float, int]] = []
+    for start in starts:
+        distances[start] = 0
+        queue.append((heuristic(start) if heuristic else 0, 0, start))
+    heapq.heapify(queue)
+
+    popped = 0
+    while queue:
+        priority, distance, state = heapq.heappop(queue)
+        if distance > distances[state]:
+            # we already got here in a better way
+            continue
+        popped += 1
+
+        if result.goal is not None and priority > distances[result.goal]:
+            break
+        if is_goal is not None and is_goal(state):
+            if result.goal is None:
+                result.goal = state
+            if not all_paths:
+                break
+            continue
+
+        for next_state, cost in neighbours(state):
+            next_distance = distance + cost
+            if next_distance < distances[next_state]:
+                distances[next_state] = next_distance
+                parents[next_state] = state
+                if all_paths:
+                    predecessors[next_state] = [state]
+                next_priority = next_distance + heuristic(next_state) if heuristic else next_distance
+                heapq.heappush(queue, (next_priority, next_distance, next_state))
+            elif all_paths and next_distance == distances[next_state]:
+                predecessors[next_state].append(state)
+
+    profiler.count('search states', popped)
+    return result
+
+
+def a_star(
+    starts: Iterable[int],
+    neighbours: Callable[[int], Iterable[tuple[int, float]]],
+    size: int,
+    heuristic: Callable[[int], float],
+    is_goal: Callable[[int], bool] | None = None,
+    all_paths: bool = False,
+) -> SearchResult:
+    return dijkstra(starts, neighbours, size, is_goal, heuristic, all_paths)
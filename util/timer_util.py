@@ -1,4 +1,7 @@
+import atexit
+import os
 import timeit
+from contextlib import nullcontext
 
 
 class ContextTimer:
@@ -12,3 +15,108 @@ class ContextTimer:
         duration = timeit.default_timer() - self.start
         if duration > self.threshold:
             print(f'duration: {duration:.02f}s')
+
+
+class Span:
+    """
+    A named node in the tree of timed sections.
+    Entering the same span multiple times adds up the durations, so spans are only created once per place in the tree.
+    """
+
+    __slots__ = ('name', 'parent', 'children', 'duration', 'calls', '_start', '_profiler')
+
+    def __init__(self, name: str, parent: 'Span | None', profiler: 'Profiler'):
+        self.name = name
+        self.parent = parent
+        self.children: dict[str, Span] = {}
+        self.duration = 0.0
+        self.calls = 0
+        self._start = 0.0
+        self._profiler = profiler
+
+    def __enter__(self):
+        self._profiler.current = self
+        self.calls += 1
+        self._start = timeit.default_timer()
+        return self
+
+    def __exit__(self, *args, **kwargs):
+        self.duration += timeit.default_timer() - self._start
+        self._profiler.current = self.parent
+
+    def to_string(self, depth: int = 0) -> list[str]:
+        parent_duration = self.parent.duration if self.parent and self.parent.duration else self.duration
+        share = 100 * self.duration / parent_duration if parent_duration else 100
+        lines = [f'{"  " * depth}{self.name}: {self.duration:.04f}s  {self.calls}x  {share:.01f}%']
+        for child in self.children.values():
+            lines += child.to_string(depth + 1)
+        return lines
+
+
+_DISABLED_SPAN = nullcontext()
+
+
+class Profiler:
+    """
+    Nested timing spans, counters and gauges.
+
+    with profiler.span('search'):
+        ...
+        profiler.count('states')
+
+    When disabled, every probe returns immediately, so they can stay in the code.
+    Set the environment variable AOC_PROFILE=1 to enable the global profiler and get a report at exit.
+    """
+
+    def __init__(self, enabled: bool = False):
+        self.enabled = enabled
+        self.root = Span('total', None, self)
+        self.current = self.root
+        self.counters: dict[str, int] = {}
+        self.gauges: dict[str, tuple[float, float]] = {}
+        self._start = timeit.default_timer()
+
+    def enable(self, report_at_exit: bool = True):
+        self.enabled = True
+        if report_at_exit:
+            atexit.register(self.visualize)
+
+    def reset(self):
+        self.root = self.current = Span('total', None, self)
+        self.counters = {}
+        self.gauges = {}
+        self._start = timeit.default_timer()
+
+    def span(self, name: str) -> Span | nullcontext:
+        if not self.enabled:
+            return _DISABLED_SPAN
+        children = self.current.children
+        if name not in children:
+            children[name] = Span(name, self.current, self)
+        return children[name]
+
+    def count(self, name: str, amount: int = 1):
+        if self.enabled:
+            self.counters[name] = self.counters.get(name, 0) + amount
+
+    def gauge(self, name: str, value: float):
+        """Keep track of the last value and the highest value."""
+        if self.enabled:
+            highest = self.gauges[name][1] if name in self.gauges else value
+            self.gauges[name] = (value, max(highest, value))
+
+    def to_string(self) -> list[str]:
+        self.root.duration = timeit.default_timer() - self._start
+        self.root.calls = 1
+        lines = self.root.to_string()
+        lines += [f'{name}: {value}' for name, value in self.counters.items()]
+        lines += [f'{name}: {last} (max {highest})' for name, (last, highest) in self.gauges.items()]
+        return lines
+
+    def visualize(self):
+        print('\n'.join(self.to_string()))
+
+
+profiler = Profiler()
+if os.environ.get('AOC_PROFILE') == '1':
+    profiler.enable()
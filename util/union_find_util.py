@@ -0,0 +1,28 @@
+class UnionFind:
+    """Disjoint sets over the integers 0..size-1, with path halving and union by size."""
+
+    def __init__(self, size: int):
+        self.parents = list(range(size))
+        self.sizes = [1] * size
+
+    def find(self, item: int) -> int:
+        parents = self.parents
+        while parents[item] != item:
+            parents[item] = parents[parents[item]]
+            item = parents[item]
+        return item
+
+    def union(self, a: int, b: int) -> int:
+        """Merge the sets of both items, returning the root of the merged set."""
+        root_a = self.find(a)
+        root_b = self.find(b)
+        if root_a == root_b:
+            return root_a
+        if self.sizes[root_a] < self.sizes[root_b]:
+            root_a, root_b = root_b, root_a
+        self.parents[root_b] = root_a
+        self.sizes[root_a] += self.sizes[root_b]
+        return root_a
+
+    def connected(self, a: int, b: int) -> bool:
+        return self.find(a) == self.find(b)